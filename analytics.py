@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""Analisis offline arsip telemetry Snake Game (file JSON lines dari --telemetry).
+
+Event dari banyak file dimuat ke array NumPy lalu diagregasi secara vektor:
+heatmap kunjungan sel per layout level, distribusi penyebab kematian,
+histogram waktu menuju makanan dan tingkat penyelesaian per level.
+
+    python analytics.py logs/*.jsonl --level 3
+"""
+import argparse
+import json
+import sys
+from array import array
+
+import numpy as np
+
+from main import ANSI_COLORS, ANSI_RESET, Colors
+
+DEATH_CAUSES = ("wall", "self", "other", "obstacle")
+RESULTS = ("complete", "game_over", "quit", "board_full", "cycle_full")
+
+# Palet heatmap dari jarang ke sering dikunjungi
+HEAT_PALETTE = (Colors.BLUE, Colors.CYAN, Colors.GREEN, Colors.YELLOW, Colors.RED)
+HEAT_CHARS = "░▒▓██"
+
+
+class GameArchive:
+    """Kumpulan run (satu run = satu level yang dimainkan) dalam bentuk array"""
+
+    def __init__(self):
+        # Per run
+        self.run_level = array("i")
+        self.run_rows = array("i")
+        self.run_cols = array("i")
+        self.run_result = array("i")
+        # Per event
+        self.move_run = array("i")
+        self.move_y = array("i")
+        self.move_x = array("i")
+        self.death_run = array("i")
+        self.death_cause = array("i")
+        self.food_run = array("i")
+        self.food_tick = array("i")
+
+    @classmethod
+    def load(cls, paths):
+        archive = cls()
+        for path in paths:
+            archive.load_file(path)
+        archive.freeze()
+        return archive
+
+    def load_file(self, path):
+        causes = {cause: i for i, cause in enumerate(DEATH_CAUSES)}
+        results = {result: i for i, result in enumerate(RESULTS)}
+        run = -1
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                event = record["event"]
+                if event == "move":
+                    if run >= 0:
+                        self.move_run.append(run)
+                        self.move_y.append(record["y"])
+                        self.move_x.append(record["x"])
+                elif event == "food":
+                    if run >= 0:
+                        self.food_run.append(run)
+                        self.food_tick.append(record["tick"])
+                elif event == "level_start":
+                    run = len(self.run_level)
+                    self.run_level.append(record["level"])
+                    self.run_rows.append(record["rows"])
+                    self.run_cols.append(record["cols"])
+                    self.run_result.append(-1)
+                elif event == "death":
+                    if run >= 0:
+                        self.death_run.append(run)
+                        self.death_cause.append(causes.get(record["cause"], -1))
+                elif event == "level_end":
+                    if run >= 0:
+                        self.run_result[run] = results.get(record["result"], -1)
+                    run = -1
+
+    def freeze(self):
+        # Ubah array.array menjadi ndarray tanpa menyalin
+        for name, value in list(vars(self).items()):
+            if isinstance(value, array):
+                setattr(self, name, np.frombuffer(value, dtype=np.int32) if len(value) else np.zeros(0, np.int32))
+
+    @property
+    def ticks(self):
+        return len(self.move_run)
+
+    def layouts(self):
+        """Layout unik (level, rows, cols) beserta indeks run-nya"""
+        keys = np.stack([self.run_level, self.run_rows, self.run_cols], axis=1)
+        unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+        return [tuple(int(v) for v in key) for key in unique], inverse.reshape(-1)
+
+    def heatmaps(self):
+        """Jumlah kunjungan kepala per sel untuk setiap layout"""
+        if not len(self.run_level):
+            return {}
+        keys, run_layout = self.layouts()
+        move_layout = run_layout[self.move_run]
+        maps = {}
+        for layout_id, (level, rows, cols) in enumerate(keys):
+            mask = move_layout == layout_id
+            y = np.clip(self.move_y[mask], 0, rows - 1)
+            x = np.clip(self.move_x[mask], 0, cols - 1)
+            counts = np.bincount(y * cols + x, minlength=rows * cols)
+            maps[(level, rows, cols)] = counts.reshape(rows, cols)
+        return maps
+
+    def death_distribution(self):
+        valid = self.death_cause[self.death_cause >= 0]
+        counts = np.bincount(valid, minlength=len(DEATH_CAUSES))
+        return dict(zip(DEATH_CAUSES, counts.tolist()))
+
+    def time_to_food(self, bins=20):
+        """Histogram jumlah tick antar makanan (dihitung dari awal level)"""
+        if not len(self.food_tick):
+            return np.zeros(0, np.int64), np.zeros(1)
+        order = np.lexsort((self.food_tick, self.food_run))
+        runs = self.food_run[order]
+        ticks = self.food_tick[order]
+        previous = np.zeros_like(ticks)
+        same_run = np.zeros(len(ticks), dtype=bool)
+        same_run[1:] = runs[1:] == runs[:-1]
+        previous[1:] = np.where(same_run[1:], ticks[:-1], 0)
+        return np.histogram(ticks - previous, bins=bins)
+
+    def completion_rates(self):
+        """Tingkat penyelesaian per level dari run yang memiliki hasil"""
+        finished = self.run_result >= 0
+        levels = self.run_level[finished]
+        completed = self.run_result[finished] == RESULTS.index("complete")
+        played = np.bincount(levels)
+        won = np.bincount(levels[completed], minlength=len(played))
+        return {level: (int(won[level]), int(played[level]))
+                for level in np.nonzero(played)[0].tolist()}
+
+
+def render_heatmap(counts, width=80):
+    """Heatmap sebagai teks berwarna ANSI dengan palet Colors"""
+    rows, cols = counts.shape
+    factor = max(1, -(-cols // width))
+    # Gabungkan blok factor x factor agar muat di lebar terminal
+    pad_y, pad_x = -rows % factor, -cols % factor
+    padded = np.pad(counts, ((0, pad_y), (0, pad_x)))
+    reduced = padded.reshape(padded.shape[0] // factor, factor, -1, factor).sum(axis=(1, 3))
+
+    visited = reduced > 0
+    scaled = np.zeros(reduced.shape, dtype=np.int64)
+    if visited.any():
+        logs = np.log1p(reduced[visited])
+        span = max(logs.max() - logs.min(), 1e-9)
+        levels = ((logs - logs.min()) / span * len(HEAT_PALETTE)).astype(np.int64)
+        scaled[visited] = np.minimum(levels, len(HEAT_PALETTE) - 1)
+
+    lines = []
+    for row_levels, row_visited in zip(scaled, visited):
+        parts = []
+        for level, seen in zip(row_levels.tolist(), row_visited.tolist()):
+            if seen:
+                parts.append(f"{ANSI_COLORS[HEAT_PALETTE[level]]}{HEAT_CHARS[level]}")
+            else:
+                parts.append(" ")
+        lines.append("".join(parts) + ANSI_RESET)
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analisis arsip telemetry Snake Game")
+    parser.add_argument("paths", nargs="+", help="file JSON lines dari --telemetry")
+    parser.add_argument("--level", type=int, help="hanya tampilkan heatmap level ini")
+    parser.add_argument("--width", type=int, default=80, help="lebar maksimum heatmap")
+    parser.add_argument("--bins", type=int, default=20, help="jumlah bin histogram waktu makan")
+    args = parser.parse_args(argv)
+
+    archive = GameArchive.load(args.paths)
+    print(f"Runs: {len(archive.run_level)}  Ticks: {archive.ticks}  Food: {len(archive.food_tick)}")
+
+    print("\nDeath causes:")
+    for cause, count in archive.death_distribution().items():
+        print(f"  {cause:<9} {count}")
+
+    print("\nCompletion rate per level:")
+    for level, (won, played) in archive.completion_rates().items():
+        print(f"  Level {level}: {won}/{played} ({100.0 * won / played:.1f}%)")
+
+    counts, edges = archive.time_to_food(args.bins)
+    if len(counts):
+        print("\nTicks to food:")
+        peak = counts.max()
+        for count, lo, hi in zip(counts.tolist(), edges[:-1], edges[1:]):
+            bar = "█" * int(40 * count / peak) if peak else ""
+            print(f"  {lo:7.1f}-{hi:7.1f} {count:8d} {bar}")
+
+    for (level, rows, cols), heatmap in archive.heatmaps().items():
+        if args.level is not None and level != args.level:
+            continue
+        print(f"\nHeatmap level {level} ({cols}x{rows}):")
+        print(render_heatmap(heatmap, args.width))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Contoh bot eksternal untuk protokol --bot1/--bot2 di main.py.
+
+Bot membangun ulang keadaan papan dari pesan "start" lalu menerapkan delta
+setiap tick, kemudian memilih langkah aman yang paling dekat ke makanan.
+
+    python main.py --bot1 "python bot_example.py"
+"""
+import json
+import sys
+
+MOVES = {"up": (-1, 0), "down": (1, 0), "left": (0, -1), "right": (0, 1)}
+
+
+class Board:
+    def __init__(self, message):
+        self.you = message["you"]
+        self.walls = {tuple(cell) for cell in message["walls"]}
+        self.snakes = [[tuple(cell) for cell in snake] for snake in message["snakes"]]
+        self.items = {(y, x): kind for y, x, kind in message["items"]}
+        self.food = message["kinds"].index("food")
+        self.hazard = message["kinds"].index("hazard")
+
+    def apply(self, message):
+        for player, y, x, grew in message.get("m", ()):
+            snake = self.snakes[player - 1]
+            snake.insert(0, (y, x))
+            if not grew:
+                snake.pop()
+        for y, x in message.get("r", ()):
+            self.items.pop((y, x), None)
+        for y, x, kind in message.get("i", ()):
+            self.items[(y, x)] = kind
+
+    def choose(self):
+        snake = self.snakes[self.you - 1]
+        head = snake[0]
+        # Seperti collision_cause di main.py: tabrakan diperiksa terhadap tubuh
+        # sebelum bergerak, jadi ekor (milik sendiri maupun lawan) tetap terlarang
+        blocked = self.walls | {cell for body in self.snakes for cell in body}
+        blocked |= {cell for cell, kind in self.items.items() if kind == self.hazard}
+        foods = [cell for cell, kind in self.items.items() if kind == self.food]
+        best = None
+        for name, (dy, dx) in MOVES.items():
+            cell = (head[0] + dy, head[1] + dx)
+            if cell in blocked or (len(snake) > 1 and cell == snake[1]):
+                continue
+            distance = min((abs(cell[0] - f[0]) + abs(cell[1] - f[1]) for f in foods), default=0)
+            if best is None or distance < best[0]:
+                best = (distance, name)
+        return best[1] if best else "up"
+
+
+def main():
+    board = None
+    for line in sys.stdin:
+        message = json.loads(line)
+        if message["type"] == "start":
+            board = Board(message)
+        elif message["type"] == "tick" and board:
+            board.apply(message)
+            sys.stdout.write(json.dumps({"t": message["t"], "move": board.choose()}) + "\n")
+            sys.stdout.flush()
+        elif message["type"] == "end":
+            board = None
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
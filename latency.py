@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""Benchmark latensi input-ke-layar end-to-end untuk SnakeGame.
+
+main.py dijalankan apa adanya di pseudo-terminal. Harness menavigasi menu ke
+difficulty yang diuji, lalu menekan tombol belok pada fase tick yang acak dan
+mengukur waktu dari tombol ditulis ke terminal sampai kepala ular terlihat
+bergerak ke arah baru di output. Output diurai dengan emulator terminal kecil
+sehingga yang diukur adalah apa yang benar-benar dilihat pemain, termasuk
+waktu tunggu input, gambar frame dan jalur pty.
+
+    python latency.py --backend both --samples 40
+"""
+import argparse
+import codecs
+import fcntl
+import json
+import os
+import pty
+import random
+import re
+import select
+import signal
+import struct
+import sys
+import termios
+import time
+
+import main
+from main import Colors
+
+# Difficulty -> (tombol di layar difficulty, periode tick dalam detik)
+DIFFICULTIES = {
+    "EASY": ("1", 0.2),
+    "NORMAL": ("2", 0.15),
+    "HARD": ("3", 0.1),
+    "EXPERT": ("4", 0.05),
+}
+KEYS = {(-1, 0): "w", (1, 0): "s", (0, -1): "a", (0, 1): "d"}
+HEAD = ("■", Colors.GREEN)
+
+ESCAPE = re.compile(r"\x1b(?:\[([?>=]?)([0-9;]*)([@-~])|\][^\x07\x1b]*(?:\x07|\x1b\\)|[()*+].|.)", re.S)
+INCOMPLETE = re.compile(r"\x1b(?:\[[?>=]?[0-9;]*|\][^\x07\x1b]*|[()*+])?$")
+
+
+class Terminal:
+    """Emulator VT100/xterm minimal: cukup untuk melacak karakter dan warna sel.
+
+    Hanya sequence yang dipakai ncurses dan mode fallback yang ditangani;
+    sequence lain diabaikan. Sel kepala ular (HEAD) dicatat di heads setiap
+    kali sebuah sel ditulis atau dihapus.
+    """
+
+    def __init__(self, rows, cols):
+        self.rows, self.cols = rows, cols
+        self.cells = {}
+        self.heads = set()
+        self.y = self.x = 0
+        self.fg = 0
+        self.last = " "
+        self.top, self.bottom = 0, rows - 1
+        self.decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self.pending = ""
+
+    def feed(self, data):
+        text = self.pending + self.decoder.decode(data)
+        # Escape sequence yang terpotong di akhir chunk disimpan untuk chunk berikutnya
+        tail = INCOMPLETE.search(text)
+        if tail:
+            text, self.pending = text[:tail.start()], text[tail.start():]
+        else:
+            self.pending = ""
+        pos = 0
+        for match in ESCAPE.finditer(text):
+            self.write(text[pos:match.start()])
+            if match.group(3):
+                self.csi(match.group(1), match.group(2), match.group(3))
+            pos = match.end()
+        self.write(text[pos:])
+
+    def put(self, y, x, char, fg):
+        cell = (y, x)
+        if char == " ":
+            self.cells.pop(cell, None)
+        else:
+            self.cells[cell] = (char, fg)
+        if (char, fg) == HEAD:
+            self.heads.add(cell)
+        else:
+            self.heads.discard(cell)
+
+    def erase(self, y, x0, x1):
+        for x in range(x0, x1):
+            if (y, x) in self.cells:
+                self.put(y, x, " ", 0)
+
+    def write(self, text):
+        for char in text:
+            if char == "\r":
+                self.x = 0
+            elif char == "\n":
+                self.line_feed()
+            elif char == "\b":
+                self.x = max(0, self.x - 1)
+            elif char == "\t":
+                self.x = min(self.cols - 1, (self.x // 8 + 1) * 8)
+            elif char >= " ":
+                if self.x >= self.cols:
+                    self.x = 0
+                    self.line_feed()
+                self.put(self.y, self.x, char, self.fg)
+                self.last = char
+                self.x += 1
+
+    def line_feed(self):
+        if self.y != self.bottom:
+            self.y = min(self.rows - 1, self.y + 1)
+            return
+        # Scroll region satu baris ke atas
+        moved = {}
+        for (y, x), value in self.cells.items():
+            if self.top <= y <= self.bottom:
+                if y > self.top:
+                    moved[(y - 1, x)] = value
+            else:
+                moved[(y, x)] = value
+        self.cells = moved
+        self.heads = {cell for cell, value in moved.items() if value == HEAD}
+
+    def csi(self, private, params, final):
+        if private:
+            return
+        args = [int(p) if p else 0 for p in params.split(";")] if params else []
+        first = args[0] if args else 0
+        count = max(1, first)
+        if final in "Hf":
+            self.y = min(self.rows - 1, max(1, first) - 1)
+            self.x = min(self.cols - 1, max(1, args[1] if len(args) > 1 else 1) - 1)
+        elif final == "A":
+            self.y = max(0, self.y - count)
+        elif final == "B":
+            self.y = min(self.rows - 1, self.y + count)
+        elif final == "C":
+            self.x = min(self.cols - 1, self.x + count)
+        elif final == "D":
+            self.x = max(0, self.x - count)
+        elif final in "G`":
+            self.x = min(self.cols - 1, count - 1)
+        elif final == "d":
+            self.y = min(self.rows - 1, count - 1)
+        elif final == "J":
+            if first == 0:
+                self.erase(self.y, self.x, self.cols)
+                rows = range(self.y + 1, self.rows)
+            elif first == 1:
+                self.erase(self.y, 0, self.x + 1)
+                rows = range(0, self.y)
+            else:
+                rows = range(self.rows)
+            for y in rows:
+                self.erase(y, 0, self.cols)
+        elif final == "K":
+            if first == 0:
+                self.erase(self.y, self.x, self.cols)
+            elif first == 1:
+                self.erase(self.y, 0, self.x + 1)
+            else:
+                self.erase(self.y, 0, self.cols)
+        elif final == "X":
+            self.erase(self.y, self.x, self.x + count)
+        elif final == "b":
+            self.write(self.last * count)
+        elif final == "r":
+            self.top = max(1, first) - 1
+            self.bottom = min(self.rows, args[1] if len(args) > 1 and args[1] else self.rows) - 1
+            self.y = self.x = 0
+        elif final == "m":
+            self.sgr(args or [0])
+
+    def sgr(self, args):
+        i = 0
+        while i < len(args):
+            code = args[i]
+            if code in (0, 39):
+                self.fg = 0
+            elif 30 <= code <= 37:
+                self.fg = code - 30
+            elif 90 <= code <= 97:
+                self.fg = code - 90
+            elif code in (38, 48):
+                # Warna 256 (5;n) atau RGB (2;r;g;b)
+                mode = args[i + 1] if i + 1 < len(args) else None
+                if mode == 5:
+                    if code == 38 and i + 2 < len(args) and args[i + 2] < 16:
+                        self.fg = args[i + 2] % 8
+                    i += 2
+                elif mode == 2:
+                    i += 4
+            i += 1
+
+
+class Session:
+    """Satu proses main.py di pseudo-terminal beserta pelacak kepala ular"""
+
+    def __init__(self, backend, difficulty, args):
+        self.rows, self.cols = args.rows, args.cols
+        command = [sys.executable, os.path.abspath(main.__file__)]
+        if backend == "fallback":
+            command.append("--no-curses")
+        self.pid, self.master = pty.fork()
+        if self.pid == 0:
+            fcntl.ioctl(0, termios.TIOCSWINSZ, struct.pack("HHHH", args.rows, args.cols, 0, 0))
+            os.environ.setdefault("TERM", "xterm-256color")
+            os.execv(sys.executable, command)
+        self.terminal = Terminal(args.rows, args.cols)
+        self.head = None
+        self.direction = None
+        self.moves = 0
+        self.last_move = None
+        self.alive = True
+
+    def pump(self, timeout):
+        """Baca output yang tersedia (menunggu sampai timeout); False jika proses selesai"""
+        ready, _, _ = select.select([self.master], [], [], max(0, timeout))
+        if not ready:
+            return True
+        try:
+            data = os.read(self.master, 65536)
+        except OSError:
+            data = b""
+        if not data:
+            self.alive = False
+            return False
+        now = time.perf_counter()
+        self.terminal.feed(data)
+        self.track(now)
+        return True
+
+    def track(self, now):
+        # Saat frame sedang digambar kepala lama dan baru bisa sama-sama hijau
+        heads = self.terminal.heads - {self.head}
+        if len(heads) != 1:
+            return
+        head = next(iter(heads))
+        if self.head and abs(head[0] - self.head[0]) + abs(head[1] - self.head[1]) == 1:
+            self.direction = (head[0] - self.head[0], head[1] - self.head[1])
+            self.moves += 1
+            self.last_move = now
+        self.head = head
+
+    def wait(self, predicate, timeout):
+        deadline = time.perf_counter() + timeout
+        while not predicate():
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 or not self.pump(remaining):
+                return False
+        return True
+
+    def settle(self, quiet=0.3, timeout=5.0):
+        """Tunggu sampai output berhenti selama quiet detik"""
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            ready, _, _ = select.select([self.master], [], [], quiet)
+            if not ready:
+                return
+            self.pump(0)
+
+    def sleep(self, seconds):
+        # Output tetap dibaca selama menunggu agar proses anak tidak terblokir
+        deadline = time.perf_counter() + seconds
+        while self.alive:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            self.pump(remaining)
+
+    def press(self, key):
+        os.write(self.master, key.encode())
+        return time.perf_counter()
+
+    def close(self):
+        try:
+            os.kill(self.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        os.waitpid(self.pid, 0)
+        os.close(self.master)
+
+
+def start_game(backend, difficulty, args):
+    """Jalankan main.py dan navigasi menu: Settings -> Difficulty -> Menu -> Single Player"""
+    session = Session(backend, difficulty, args)
+    session.settle()
+    for key in ("3", "3", DIFFICULTIES[difficulty][0], "5"):
+        session.press(key)
+        session.settle(quiet=0.15)
+    # Setelah game dimulai output tidak pernah diam, jadi langsung tunggu ular
+    session.press("1")
+    if not session.wait(lambda: session.direction is not None, 5.0):
+        session.close()
+        raise RuntimeError(f"{backend}/{difficulty}: snake not visible after starting a game")
+    return session
+
+
+def turn_towards_center(session):
+    """Belokan tegak lurus yang mengarah ke tengah papan agar ular jauh dari dinding"""
+    (y, x), (dy, dx) = session.head, session.direction
+    if dy == 0:
+        return (-1, 0) if y > session.rows // 2 else (1, 0)
+    return (0, -1) if x > session.cols // 2 else (0, 1)
+
+
+def measure(backend, difficulty, args, rng):
+    period = DIFFICULTIES[difficulty][1]
+    latencies = []
+    timeouts = 0
+    sessions = 0
+    session = None
+    try:
+        while len(latencies) < args.samples:
+            if session is None:
+                session = start_game(backend, difficulty, args)
+                sessions += 1
+            # Beberapa langkah lurus dulu, lalu tekan tombol pada fase tick acak
+            target = session.moves + rng.randint(3, 5)
+            if not session.wait(lambda: session.moves >= target, period * 8 + 1.0):
+                # Mati, level selesai atau power-up habis: mulai sesi baru
+                session.close()
+                session = None
+                continue
+            session.sleep(rng.uniform(0, period))
+            direction = turn_towards_center(session)
+            moves = session.moves
+            pressed = session.press(KEYS[direction])
+            if session.wait(lambda: session.direction == direction, period * 4 + args.timeout):
+                latencies.append(session.last_move - pressed)
+                continue
+            # Ular tetap berjalan lurus berarti tombolnya hilang; jika berhenti
+            # bergerak, permainan sudah selesai sebelum belokan sempat terjadi
+            if session.moves - moves >= 2:
+                timeouts += 1
+            session.close()
+            session = None
+    finally:
+        if session:
+            session.close()
+    return {"backend": backend, "difficulty": difficulty, "period": period,
+            "latencies": latencies, "timeouts": timeouts, "sessions": sessions}
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def check(result, args):
+    """Bandingkan dengan latensi ideal.
+
+    Tombol ditekan pada fase tick acak dan belokan baru terlihat pada gerak
+    berikutnya, jadi latensi ideal tersebar rata antara 0 dan satu periode
+    tick: p50 sekitar setengah periode dan p99 sekitar satu periode. Selisih
+    di atas itu adalah waktu tunggu atau gambar yang tidak perlu.
+    """
+    failures = []
+    if result["timeouts"]:
+        failures.append(f"{result['timeouts']} key presses never reached the screen")
+    if result["latencies"]:
+        period = result["period"]
+        for name, fraction, ideal in (("p50", 0.5, period / 2), ("p99", 0.99, period)):
+            excess = percentile(result["latencies"], fraction) - ideal
+            if excess * 1000 > args.max_excess:
+                failures.append(f"{name} exceeds the ideal by {excess * 1000:.1f} ms")
+    return failures
+
+
+def report(result, failures, bins):
+    latencies = [value * 1000 for value in result["latencies"]]
+    print(f"\n== {result['backend']} / {result['difficulty']} "
+          f"(tick {result['period'] * 1000:.0f} ms, {result['sessions']} sessions) ==")
+    if not latencies:
+        print("  no samples")
+    else:
+        print(f"  n={len(latencies)} min={min(latencies):.1f} p50={percentile(latencies, 0.5):.1f} "
+              f"p90={percentile(latencies, 0.9):.1f} p99={percentile(latencies, 0.99):.1f} "
+              f"max={max(latencies):.1f} ms")
+        lo, hi = min(latencies), max(latencies)
+        width = max((hi - lo) / bins, 1e-9)
+        counts = [0] * bins
+        for value in latencies:
+            counts[min(bins - 1, int((value - lo) / width))] += 1
+        peak = max(counts)
+        for i, count in enumerate(counts):
+            bar = "█" * int(40 * count / peak) if peak else ""
+            print(f"  {lo + i * width:7.1f}-{lo + (i + 1) * width:7.1f} {count:5d} {bar}")
+    print("  FAIL: " + "; ".join(failures) if failures else "  OK")
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark latensi input-ke-layar SnakeGame")
+    parser.add_argument("--backend", choices=("curses", "fallback", "both"), default="both")
+    parser.add_argument("--difficulty", choices=tuple(DIFFICULTIES) + ("all",), default="all")
+    parser.add_argument("--samples", type=int, default=40, help="jumlah belokan per kombinasi")
+    parser.add_argument("--rows", type=int, default=24)
+    parser.add_argument("--cols", type=int, default=80)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bins", type=int, default=10, help="jumlah bin histogram")
+    parser.add_argument("--timeout", type=float, default=1.0,
+                        help="detik tambahan sebelum belokan dianggap hilang")
+    parser.add_argument("--max-excess", type=float, default=25.0,
+                        help="ms p50/p99 di atas latensi ideal yang masih diterima")
+    parser.add_argument("--json", metavar="PATH", help="simpan latensi mentah ke PATH")
+    args = parser.parse_args(argv)
+
+    backends = ("curses", "fallback") if args.backend == "both" else (args.backend,)
+    difficulties = tuple(DIFFICULTIES) if args.difficulty == "all" else (args.difficulty,)
+    rng = random.Random(args.seed)
+    results = []
+    failed = False
+    for backend in backends:
+        for difficulty in difficulties:
+            result = measure(backend, difficulty, args, rng)
+            failures = check(result, args)
+            report(result, failures, args.bins)
+            results.append(result)
+            failed = failed or bool(failures)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
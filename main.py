@@ -1,8 +1,25 @@
 #!/usr/bin/env python3
+import argparse
+import asyncio
+import bisect
+import heapq
+import json
 import os
+import queue
 import random
+import select
+import selectors
+import shlex
+import signal
+import struct
+import subprocess
+import threading
 import time
 import sys
+import unicodedata
+import zlib
+from array import array
+from collections import deque
 from enum import Enum
 
 # Deteksi platform
@@ -13,12 +30,41 @@ except ImportError:
     HAS_CURSES = False
     print("Curses not available, using fallback input system")
 
+# Mode cbreak untuk input fallback di Linux/Termux (tidak ada di Windows)
+try:
+    import termios
+    import tty
+except ImportError:
+    termios = None
+
+# Shared memory untuk --split-render; build Python Android/Termux bisa tidak punya _posixshmem
+try:
+    import multiprocessing
+    from multiprocessing import shared_memory
+except ImportError:
+    multiprocessing = shared_memory = None
+
 class Direction(Enum):
     UP = 1
     DOWN = 2
     LEFT = 3
     RIGHT = 4
 
+# Perubahan (dy, dx) untuk setiap arah
+DIRECTION_DELTAS = {
+    Direction.UP: (-1, 0),
+    Direction.DOWN: (1, 0),
+    Direction.LEFT: (0, -1),
+    Direction.RIGHT: (0, 1),
+}
+
+OPPOSITE = {
+    Direction.UP: Direction.DOWN,
+    Direction.DOWN: Direction.UP,
+    Direction.LEFT: Direction.RIGHT,
+    Direction.RIGHT: Direction.LEFT,
+}
+
 class GameState(Enum):
     MENU = 1
     PLAYING = 2
@@ -27,6 +73,9 @@ class GameState(Enum):
     PAUSED = 5
     SETTINGS = 6
     HIGH_SCORES = 7
+    BOARD_FULL = 8
+    REPLAY = 9
+    CYCLE_FULL = 10
 
 class Colors:
     RED = 1
@@ -37,6 +86,1366 @@ class Colors:
     CYAN = 6
     WHITE = 7
 
+# Kode warna ANSI untuk mode fallback (tanpa curses)
+ANSI_COLORS = {
+    0: "",          # Default
+    Colors.RED: "\033[91m",
+    Colors.GREEN: "\033[92m",
+    Colors.YELLOW: "\033[93m",
+    Colors.BLUE: "\033[94m",
+    Colors.MAGENTA: "\033[95m",
+    Colors.CYAN: "\033[96m",
+    Colors.WHITE: "\033[97m",
+}
+ANSI_RESET = "\033[0m"
+
+class Telemetry:
+    """Event gameplay dalam ring buffer, ditulis ke file JSON lines oleh thread latar belakang.
+
+    emit() hanya menambah tuple ke deque berukuran tetap sehingga game loop
+    tidak pernah menunggu disk. Jika penulis tertinggal, event tertua dibuang.
+    """
+    
+    def __init__(self, path, capacity=65536, batch_size=1024, flush_interval=0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.events = deque(maxlen=capacity)
+        self.emitted = 0
+        self.written = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._writer, name="telemetry-writer", daemon=True)
+        self._thread.start()
+    
+    def emit(self, event, **fields):
+        self.events.append((time.time(), event, fields))
+        self.emitted += 1
+    
+    def _writer(self):
+        with open(self.path, "a", encoding="utf-8") as f:
+            while not self._stop.wait(self.flush_interval):
+                self._flush(f)
+            self._flush(f)
+    
+    def _flush(self, f):
+        while self.events:
+            lines = []
+            try:
+                for _ in range(self.batch_size):
+                    t, event, fields = self.events.popleft()
+                    record = {"t": round(t, 6), "event": event}
+                    record.update(fields)
+                    lines.append(json.dumps(record, separators=(",", ":")) + "\n")
+            except IndexError:
+                pass
+            f.write("".join(lines))
+            self.written += len(lines)
+        f.flush()
+    
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        dropped = self.emitted - self.written
+        if dropped > 0:
+            print(f"Telemetry: {dropped} event dibuang karena buffer penuh")
+
+class HamiltonianCycle:
+    """Siklus Hamilton atas sel bebas area bermain untuk mode autopilot.
+
+    Area dibagi menjadi blok 2x2. Blok yang keempat selnya bebas dihubungkan
+    dengan spanning tree (BFS) per komponen, lalu siklus tiap komponen
+    dibentuk dengan menyusuri tepi pohonnya. Setiap siklus diperluas dengan
+    jalan memutar: sisi a -> b diganti a -> c -> d -> b bila c, d sepasang
+    sel bebas di sebelahnya, sehingga baris/kolom sisa ikut tercakup.
+
+    Siklus yang bersentuhan dengan dua sisi sejajar digabung langsung.
+    Komponen yang terpisah dinding dengan celah selebar satu sel (level 3
+    dan 4) disambung lewat sepasang celah: siklus masuk lewat celah pertama,
+    menyusuri busur terpanjang siklus tetangga, lalu kembali lewat celah
+    kedua. Sel di busur pendek yang terlepas dipungut lagi dengan jalan
+    memutar. Ruang yang hanya punya satu celah atau lorong lebih dari satu
+    sel, dan sel yang tidak bisa dipungut karena paritas, dicatat di
+    uncovered.
+    """
+    
+    def __init__(self, top, left, rows, cols, blocked):
+        block_rows, block_cols = rows // 2, cols // 2
+        y0, x0 = top + 1, left + 1
+        
+        free = set()
+        for i in range(block_rows):
+            y = y0 + 2 * i
+            for j in range(block_cols):
+                x = x0 + 2 * j
+                if ((y, x) not in blocked and (y, x + 1) not in blocked and
+                        (y + 1, x) not in blocked and (y + 1, x + 1) not in blocked):
+                    free.add((i, j))
+        
+        # Spanning tree BFS untuk setiap komponen blok
+        seen = set()
+        trees = []
+        for root in sorted(free):
+            if root in seen:
+                continue
+            seen.add(root)
+            blocks, edges = [root], []
+            queue = deque([root])
+            while queue:
+                i, j = queue.popleft()
+                for nb in ((i, j + 1), (i + 1, j), (i, j - 1), (i - 1, j)):
+                    if nb in free and nb not in seen:
+                        seen.add(nb)
+                        blocks.append(nb)
+                        edges.append(((i, j), nb))
+                        queue.append(nb)
+            trees.append((blocks, edges))
+        
+        # owner: sel -> nomor siklus (komponen) yang melewatinya
+        nxt = {}
+        owner = {}
+        for cycle_id, (blocks, edges) in enumerate(trees):
+            # Arah dasar dalam satu blok: TL -> BL -> BR -> TR -> TL
+            for i, j in blocks:
+                y, x = y0 + 2 * i, x0 + 2 * j
+                nxt[(y, x)] = (y + 1, x)
+                nxt[(y + 1, x)] = (y + 1, x + 1)
+                nxt[(y + 1, x + 1)] = (y, x + 1)
+                nxt[(y, x + 1)] = (y, x)
+                for cell in ((y, x), (y + 1, x), (y + 1, x + 1), (y, x + 1)):
+                    owner[cell] = cycle_id
+            
+            # Setiap sisi pohon menggabungkan dua siklus blok menjadi satu
+            for a, b in edges:
+                if a > b:
+                    a, b = b, a
+                y, x = y0 + 2 * a[0], x0 + 2 * a[1]
+                if a[0] == b[0]:
+                    # b di kanan a
+                    nxt[(y + 1, x + 1)] = (y + 1, x + 2)
+                    nxt[(y, x + 2)] = (y, x + 1)
+                else:
+                    # b di bawah a
+                    nxt[(y + 1, x)] = (y + 2, x)
+                    nxt[(y + 2, x + 1)] = (y + 1, x + 1)
+        
+        open_cells = [(y, x) for y in range(y0, y0 + rows) for x in range(x0, x0 + cols)
+                      if (y, x) not in blocked]
+        
+        def is_free(cell):
+            return (y0 <= cell[0] < y0 + rows and x0 <= cell[1] < x0 + cols and
+                    cell not in blocked and cell not in nxt)
+        
+        def extend(pending):
+            # Perluas siklus dengan jalan memutar lewat pasangan sel bebas
+            while pending:
+                a, b = pending.pop()
+                if nxt.get(a) != b:
+                    continue
+                dy, dx = b[0] - a[0], b[1] - a[1]
+                for py, px in ((dx, dy), (-dx, -dy)):
+                    c, d = (a[0] + py, a[1] + px), (b[0] + py, b[1] + px)
+                    if is_free(c) and is_free(d):
+                        nxt[a], nxt[c], nxt[d] = c, d, b
+                        owner[c] = owner[d] = owner[a]
+                        pending += ((a, c), (c, d), (d, b))
+                        break
+        
+        def walk(start):
+            cells = [start]
+            cell = nxt[start]
+            while cell != start:
+                cells.append(cell)
+                cell = nxt[cell]
+            return cells
+        
+        def join():
+            # Gabungkan siklus yang bersentuhan langsung: sisi p -> q dan sisi
+            # sejajar q2 -> p2 di siklus lain menjadi p -> p2 ... q2 -> q
+            sizes = {}
+            for cycle_id in owner.values():
+                sizes[cycle_id] = sizes.get(cycle_id, 0) + 1
+            joined = False
+            if len(sizes) < 2:
+                return joined
+            for p, q in list(nxt.items()):
+                if nxt.get(p) != q:
+                    continue
+                dy, dx = q[0] - p[0], q[1] - p[1]
+                for py, px in ((dx, dy), (-dx, -dy)):
+                    p2, q2 = (p[0] + py, p[1] + px), (q[0] + py, q[1] + px)
+                    a, b = owner[p], owner.get(p2)
+                    if b is None or b == a or owner.get(q2) != b:
+                        continue
+                    if nxt[p2] != q2 and nxt[q2] != p2:
+                        continue
+                    small = a if sizes[a] < sizes[b] else b
+                    cells = walk(p if small == a else p2)
+                    if nxt[p2] == q2:
+                        # Arah sejajar: balik siklus yang lebih kecil dulu
+                        for cell, previous in zip(cells, cells[-1:] + cells[:-1]):
+                            nxt[cell] = previous
+                        if small == a:
+                            p, q, p2, q2 = q, p, q2, p2
+                    nxt[p], nxt[q2] = p2, q
+                    for cell in cells:
+                        owner[cell] = a + b - small
+                    sizes[a + b - small] += sizes.pop(small)
+                    joined = True
+                    break
+            return joined
+        
+        # Siklus besar diperluas lebih dulu agar sel sisa tidak direbut
+        # komponen kecil
+        by_owner = {}
+        for a, b in nxt.items():
+            by_owner.setdefault(owner[a], []).append((a, b))
+        for pending in sorted(by_owner.values(), key=len, reverse=True):
+            extend(pending)
+        
+        # Sambung siklus lewat pasangan celah sampai tidak ada yang menambah
+        # panjang siklus gabungan. Sel dua siklus yang bersentuhan langsung
+        # dihitung sebagai celah kosong (None)
+        while len(set(owner.values())) > 1:
+            joined = join()
+            gaps = {}
+            for cell in open_cells:
+                y, x = cell
+                if cell in nxt:
+                    a = owner[cell]
+                    for nb in ((y - 1, x), (y + 1, x), (y, x - 1), (y, x + 1)):
+                        if owner.get(nb, a) > a:
+                            gaps.setdefault((a, owner[nb]), []).append((None, cell, nb))
+                    continue
+                near = [nb for nb in ((y - 1, x), (y + 1, x), (y, x - 1), (y, x + 1)) if nb in owner]
+                for c in near:
+                    for d in near:
+                        if owner[c] < owner[d]:
+                            gaps.setdefault((owner[c], owner[d]), []).append((cell, c, d))
+            
+            cycles = {}
+            for cell, cycle_id in owner.items():
+                cycles.setdefault(cycle_id, cell)
+            order = {cycle_id: walk(start) for cycle_id, start in cycles.items()}
+            index = {cell: i for cells in order.values() for i, cell in enumerate(cells)}
+            
+            # Untuk setiap pasangan siklus, pilih pasangan celah yang
+            # menyisakan sel terbanyak
+            merges = []
+            for (a, b), found in gaps.items():
+                m, n = len(order[a]), len(order[b])
+                best = None
+                for k, (g1, c1, d1) in enumerate(found):
+                    for g2, c2, d2 in found[k + 1:]:
+                        if c1 == c2 or d1 == d2:
+                            continue
+                        # Busur terpanjang dari c2 ke c1 dan dari d1 ke d2
+                        ahead = (index[c1] - index[c2]) % m + 1
+                        arc_a = max(ahead, m + 2 - ahead)
+                        ahead = (index[d2] - index[d1]) % n + 1
+                        arc_b = max(ahead, n + 2 - ahead)
+                        kept = arc_a + arc_b + (g1 is not None) + (g2 is not None)
+                        if kept > max(m, n) and (best is None or kept > best[0]):
+                            best = (kept, a, b, g1, c1, d1, g2, c2, d2)
+                if best:
+                    merges.append(best)
+            if not merges:
+                if joined:
+                    continue
+                break
+            
+            # Gabungkan sebanyak mungkin per putaran; siklus yang sudah
+            # berubah menunggu putaran berikutnya
+            touched = set()
+            pending = []
+            for _, a, b, g1, c1, d1, g2, c2, d2 in sorted(merges, reverse=True):
+                if a in touched or b in touched:
+                    continue
+                touched.update((a, b))
+                cells = ([g1] if g1 else []) + self.arc(order[b], index, d1, d2)
+                cells += ([g2] if g2 else []) + self.arc(order[a], index, c2, c1)
+                for cell in order[a] + order[b]:
+                    del nxt[cell]
+                    del owner[cell]
+                for cell, following in zip(cells, cells[1:] + cells[:1]):
+                    nxt[cell] = following
+                    owner[cell] = a
+                pending += zip(cells, cells[1:] + cells[:1])
+            extend(pending)
+        
+        # Hanya siklus terbesar yang dipakai
+        sizes = {}
+        for cycle_id in owner.values():
+            sizes[cycle_id] = sizes.get(cycle_id, 0) + 1
+        self.cells = []
+        if sizes:
+            largest = max(sizes, key=lambda cycle_id: (sizes[cycle_id], -cycle_id))
+            self.cells = walk(min(cell for cell, cycle_id in owner.items() if cycle_id == largest))
+        self.uncovered = len(open_cells) - len(self.cells)
+        self.index = {cell: i for i, cell in enumerate(self.cells)}
+    
+    @staticmethod
+    def arc(cells, index, start, end):
+        """Busur terpanjang siklus cells dari start sampai end (inklusif)"""
+        n = len(cells)
+        i, j = index[start], index[end]
+        ahead = (j - i) % n + 1
+        if ahead >= n + 2 - ahead:
+            return [cells[(i + k) % n] for k in range(ahead)]
+        return [cells[(i - k) % n] for k in range(n + 2 - ahead)]
+    
+    def __len__(self):
+        return len(self.cells)
+
+class TimerWheel:
+    """Timer wheel hierarkis berbasis tick simulasi.
+
+    Setiap level memiliki 64 slot; level 0 menampung timer dalam 64 tick ke
+    depan, level berikutnya rentang 64x lebih besar dan dipindahkan (cascade)
+    ke level bawah saat waktunya mendekat. schedule, cancel dan firing O(1).
+    """
+    
+    SLOT_BITS = 6
+    SLOTS = 1 << SLOT_BITS
+    LEVELS = 4
+    
+    def __init__(self):
+        self.tick = 0
+        self.wheels = [[{} for _ in range(self.SLOTS)] for _ in range(self.LEVELS)]
+    
+    def schedule(self, delay, callback):
+        timer = Timer(self.tick + max(1, int(delay)), callback)
+        self._insert(timer)
+        return timer
+    
+    def cancel(self, timer):
+        timer.cancelled = True
+        if timer.bucket is not None:
+            del timer.bucket[timer]
+            timer.bucket = None
+    
+    def rearm(self, timer, delay):
+        # Pasang lagi timer yang sudah jatuh tempo; yang dibatalkan tetap mati
+        if not timer.cancelled and timer.bucket is None:
+            timer.expires = self.tick + max(1, int(delay))
+            self._insert(timer)
+    
+    def _insert(self, timer):
+        delta = timer.expires - self.tick
+        for level in range(self.LEVELS):
+            shift = self.SLOT_BITS * level
+            if delta < self.SLOTS << shift or level == self.LEVELS - 1:
+                bucket = self.wheels[level][(timer.expires >> shift) & (self.SLOTS - 1)]
+                bucket[timer] = None
+                timer.bucket = bucket
+                return
+    
+    def advance(self):
+        """Maju satu tick dan jalankan timer yang jatuh tempo"""
+        self.tick += 1
+        
+        # Pindahkan timer level atas ke bawah saat batas slotnya terlewati
+        level = 1
+        while level < self.LEVELS and self.tick & ((1 << (self.SLOT_BITS * level)) - 1) == 0:
+            level += 1
+        for cascade in range(level - 1, 0, -1):
+            shift = self.SLOT_BITS * cascade
+            bucket = self.wheels[cascade][(self.tick >> shift) & (self.SLOTS - 1)]
+            timers = list(bucket)
+            bucket.clear()
+            for timer in timers:
+                self._insert(timer)
+        
+        bucket = self.wheels[0][self.tick & (self.SLOTS - 1)]
+        while bucket:
+            timer = next(iter(bucket))
+            del bucket[timer]
+            timer.bucket = None
+            if timer.expires <= self.tick:
+                timer.callback()
+            else:
+                # Melewati batas jangkauan level teratas, jadwalkan ulang
+                self._insert(timer)
+
+class Timer:
+    __slots__ = ("expires", "callback", "bucket", "cancelled")
+    
+    def __init__(self, expires, callback):
+        self.expires = expires
+        self.callback = callback
+        self.bucket = None
+        self.cancelled = False
+
+class TimedEntity:
+    """Entitas di area bermain yang dikendalikan timer wheel"""
+    
+    char = "?"
+    color = Colors.WHITE
+    
+    def __init__(self, y, x):
+        self.y, self.x = y, x
+        self.timer = None
+
+class BonusFood(TimedEntity):
+    char = "◆"
+    color = Colors.GREEN
+    
+    def __init__(self, y, x, points):
+        super().__init__(y, x)
+        self.points = points
+
+class SpeedBoost(TimedEntity):
+    char = "»"
+    color = Colors.CYAN
+    
+    def __init__(self, y, x, factor, duration):
+        super().__init__(y, x)
+        self.factor = factor
+        self.duration = duration
+
+class MovingObstacle(TimedEntity):
+    char = "▓"
+    color = Colors.RED
+    
+    def __init__(self, y, x, dx, period):
+        super().__init__(y, x)
+        self.dx = dx
+        self.period = period
+
+class EntityManager:
+    """Pickup dan rintangan bergerak yang hidup berdasarkan tick.
+
+    Rintangan bergerak disimpan langsung di set rintangan yang dipakai
+    check_collision, sehingga tabrakan dengannya sama seperti rintangan layout.
+    """
+    
+    def __init__(self, obstacles):
+        self.wheel = TimerWheel()
+        self.obstacles = obstacles
+        self.pickups = {}
+        self.hazards = []
+    
+    def schedule(self, delay, callback):
+        return self.wheel.schedule(delay, callback)
+    
+    def every(self, period, callback):
+        # Timer periodik memasang ulang objek Timer yang sama, jadi handle
+        # yang dikembalikan bisa dibatalkan kapan pun (juga dari callback)
+        def fire():
+            callback()
+            self.wheel.rearm(timer, period)
+        timer = self.wheel.schedule(period, fire)
+        return timer
+    
+    def tick(self):
+        self.wheel.advance()
+    
+    def is_free(self, cell):
+        return cell not in self.obstacles and cell not in self.pickups
+    
+    def add_pickup(self, entity, lifetime):
+        cell = (entity.y, entity.x)
+        self.pickups[cell] = entity
+        entity.timer = self.wheel.schedule(lifetime, lambda: self.pickups.pop(cell, None))
+    
+    def take_pickup(self, head):
+        entity = self.pickups.pop((head[0], head[1]), None)
+        if entity is not None:
+            self.wheel.cancel(entity.timer)
+        return entity
+    
+    def add_hazard(self, entity, is_blocked):
+        self.obstacles.add((entity.y, entity.x))
+        self.hazards.append(entity)
+        
+        def step():
+            # Geser satu sel, berbalik arah jika terhalang
+            for dx in (entity.dx, -entity.dx):
+                cell = (entity.y, entity.x + dx)
+                if self.is_free(cell) and not is_blocked(cell):
+                    self.obstacles.discard((entity.y, entity.x))
+                    self.obstacles.add(cell)
+                    entity.x, entity.dx = cell[1], dx
+                    break
+            entity.timer = self.wheel.schedule(entity.period, step)
+        
+        entity.timer = self.wheel.schedule(entity.period, step)
+    
+    def cells(self):
+        for (y, x), entity in self.pickups.items():
+            yield y, x, entity
+        for entity in self.hazards:
+            yield entity.y, entity.x, entity
+
+class MoveScheduler:
+    """Antrean prioritas (heap) event gerak berdasarkan waktu jatuh tempo.
+
+    Setiap aktor (ular, atau WORLD untuk timer entitas) punya periode sendiri
+    dalam mikrodetik bilangan bulat, jadi waktu yang sama benar-benar sama
+    tanpa galat floating point. pop_due() mengambil semua aktor yang jatuh
+    tempo pada instan yang sama sekaligus, terurut menurut id, sehingga
+    tabrakan gerak bersamaan selalu di-resolve dengan urutan yang sama.
+    Mengubah periode tidak mencari entri lama di heap: entri diberi versi
+    dan entri usang dibuang saat keluar dari heap.
+    """
+    
+    WORLD = 0
+    
+    def __init__(self):
+        self.queue = []
+        self.now = 0
+        self.periods = {}
+        self.versions = {}
+    
+    def add(self, actor, period):
+        self.periods[actor] = period
+        self.versions[actor] = 0
+        heapq.heappush(self.queue, (self.now + period, actor, 0))
+    
+    def set_period(self, actor, period):
+        # Gerak berikutnya dijadwalkan ulang dari sekarang dengan periode baru
+        self.periods[actor] = period
+        version = self.versions[actor] + 1
+        self.versions[actor] = version
+        heapq.heappush(self.queue, (self.now + period, actor, version))
+    
+    def _discard_stale(self):
+        while self.queue and self.queue[0][2] != self.versions[self.queue[0][1]]:
+            heapq.heappop(self.queue)
+    
+    def pop_due(self):
+        """Majukan waktu ke event berikutnya; kembalikan aktor yang bergerak saat itu"""
+        self._discard_stale()
+        due = self.queue[0][0]
+        self.now = due
+        batch = []
+        while self.queue and self.queue[0][0] == due:
+            _, actor, version = heapq.heappop(self.queue)
+            if version == self.versions[actor]:
+                batch.append(actor)
+            self._discard_stale()
+        for actor in batch:
+            heapq.heappush(self.queue, (due + self.periods[actor], actor, self.versions[actor]))
+        return batch
+    
+    def next_delay(self):
+        self._discard_stale()
+        return self.queue[0][0] - self.now
+
+class FoodIndex:
+    """Posisi makanan dalam grid bucket seragam.
+
+    "Ada makanan di sel ini" dijawab O(1) dari set sel, sedangkan pencarian
+    makanan terdekat hanya memeriksa bucket dalam cincin yang melebar dari
+    bucket kepala dan berhenti begitu cincin berikutnya pasti lebih jauh.
+    """
+    
+    def __init__(self, rows, cols, bucket_size=8):
+        self.bucket_size = bucket_size
+        self.max_ring = max(rows, cols) // bucket_size + 1
+        self.cells = set()
+        self.buckets = {}
+    
+    def __contains__(self, cell):
+        return (cell[0], cell[1]) in self.cells
+    
+    def __len__(self):
+        return len(self.cells)
+    
+    def __iter__(self):
+        return iter(self.cells)
+    
+    def add(self, cell):
+        cell = (cell[0], cell[1])
+        if cell not in self.cells:
+            self.cells.add(cell)
+            key = (cell[0] // self.bucket_size, cell[1] // self.bucket_size)
+            self.buckets.setdefault(key, set()).add(cell)
+    
+    def remove(self, cell):
+        cell = (cell[0], cell[1])
+        if cell in self.cells:
+            self.cells.remove(cell)
+            key = (cell[0] // self.bucket_size, cell[1] // self.bucket_size)
+            bucket = self.buckets[key]
+            bucket.discard(cell)
+            if not bucket:
+                del self.buckets[key]
+    
+    def nearest(self, y, x):
+        """Makanan terdekat (jarak Manhattan) dari (y, x), atau None"""
+        if not self.cells:
+            return None
+        size = self.bucket_size
+        by, bx = y // size, x // size
+        best, best_dist = None, None
+        for ring in range(self.max_ring + 1):
+            # Sel di cincin ini berjarak minimal (ring - 1) * size + 1
+            if best is not None and (ring - 1) * size + 1 > best_dist:
+                break
+            for key in self._ring(by, bx, ring):
+                bucket = self.buckets.get(key)
+                if not bucket:
+                    continue
+                for cell in bucket:
+                    dist = abs(cell[0] - y) + abs(cell[1] - x)
+                    if best is None or dist < best_dist:
+                        best, best_dist = cell, dist
+        return best
+    
+    @staticmethod
+    def _ring(by, bx, ring):
+        if ring == 0:
+            yield by, bx
+            return
+        for dx in range(-ring, ring + 1):
+            yield by - ring, bx + dx
+            yield by + ring, bx + dx
+        for dy in range(-ring + 1, ring):
+            yield by + dy, bx - ring
+            yield by + dy, bx + ring
+
+class LayoutRegions:
+    """Region sel kosong yang saling terhubung di area bermain (flood fill 4 arah).
+
+    region memetakan sel ke id region-nya sehingga "apakah sel ini bisa
+    dicapai dari sel itu" dijawab O(1), dan cells[id] menyimpan daftar sel
+    region untuk memilih sel acak yang pasti terjangkau dalam O(1).
+    """
+    
+    def __init__(self, top, bottom, left, right, blocked):
+        self.region = {}
+        self.cells = []
+        for y in range(top + 1, bottom):
+            for x in range(left + 1, right):
+                if (y, x) in blocked or (y, x) in self.region:
+                    continue
+                region_id = len(self.cells)
+                members = [(y, x)]
+                self.region[(y, x)] = region_id
+                i = 0
+                while i < len(members):
+                    cy, cx = members[i]
+                    i += 1
+                    for dy, dx in DIRECTION_DELTAS.values():
+                        cell = (cy + dy, cx + dx)
+                        if (top < cell[0] < bottom and left < cell[1] < right and
+                                cell not in blocked and cell not in self.region):
+                            self.region[cell] = region_id
+                            members.append(cell)
+                self.cells.append(members)
+    
+    def __len__(self):
+        return len(self.cells)
+    
+    def region_of(self, cell):
+        return self.region.get((cell[0], cell[1]))
+    
+    def random_cell(self, region_id=0):
+        return random.choice(self.cells[region_id])
+
+class SearchTimeout(Exception):
+    pass
+
+class SnakeAI:
+    """Lawan komputer untuk pemain 2 di mode multiplayer.
+
+    Alpha-beta atas langkah simultan: AI memilih langkah, lawan menjawab, lalu
+    kedua langkah diterapkan bersamaan dengan aturan tabrakan check_collision
+    (kepala mati jika masuk tembok, rintangan, atau tubuh mana pun sebelum
+    bergerak; dua kepala yang masuk sel yang sama sama-sama mati). Pencarian
+    menganggap kedua ular melangkah di setiap ply, walaupun di game periode
+    gerak keduanya bisa berbeda (--speed1/--speed2, power-up). Posisi di-hash dengan kunci Zobrist ke transposition table
+    berukuran tetap, dan iterative deepening berhenti saat anggaran waktu habis.
+
+    Kunci Zobrist per pemain menggabungkan sel tubuh dengan kunci kepala dan
+    ekor tersendiri, sehingga tubuh yang sama dengan arah terbalik tidak
+    berbagi entri. Tabel hanya diisi di search(), yaitu saat AI yang melangkah.
+    """
+    
+    WIN = 1000000
+    EXACT, LOWER, UPPER = 0, 1, 2
+    
+    def __init__(self, table_bits=16):
+        self.table_mask = (1 << table_bits) - 1
+        # Tabel baru dialokasikan saat AI pertama kali dipakai
+        self.table = None
+        self.zobrist = None
+        self.cols = 0
+        self.nodes = 0
+        self.depth_reached = 0
+    
+    def prepare(self, game, obstacles, foods, bodies):
+        rows, cols = game.max_y, game.max_x
+        size = rows * cols
+        if self.zobrist is None or len(self.zobrist[0]) != size:
+            # Tabel 0-1: tubuh, 2-3: kepala, 4-5: ekor (pemain AI, lawan)
+            rng = random.Random(size)
+            self.zobrist = [[rng.getrandbits(64) for _ in range(size)] for _ in range(6)]
+            self.table = [None] * (self.table_mask + 1)
+        self.cols = cols
+        self.offsets = (-cols, cols, -1, 1)
+        
+        # Tembok: semua sel di luar area bermain ditambah rintangan
+        walls = bytearray(b"\x01") * size
+        for y in range(game.game_area_top + 1, game.game_area_bottom):
+            start = y * cols
+            walls[start + game.game_area_left + 1:start + game.game_area_right] = bytes(
+                game.game_area_right - game.game_area_left - 1)
+        for y, x in obstacles:
+            if 0 <= y < rows and 0 <= x < cols:
+                walls[y * cols + x] = 1
+        self.walls = walls
+        
+        # Jarak BFS ke makanan terdekat, mengabaikan tubuh ular
+        far = size
+        dist = [far] * size
+        frontier = [y * cols + x for y, x in foods if not walls[y * cols + x]]
+        for cell in frontier:
+            dist[cell] = 0
+        while frontier:
+            nxt = []
+            for cell in frontier:
+                d = dist[cell] + 1
+                for offset in self.offsets:
+                    n = cell + offset
+                    if not walls[n] and dist[n] > d:
+                        dist[n] = d
+                        nxt.append(n)
+            frontier = nxt
+        self.food_dist = dist
+        
+        self.occ = bytearray(size)
+        self.bodies = []
+        self.key = 0
+        for player, body in enumerate(bodies):
+            cells = deque(y * cols + x for y, x in body)
+            for cell in cells:
+                self.occ[cell] += 1
+                self.key ^= self.zobrist[player][cell]
+            if cells:
+                self.key ^= self.zobrist[2 + player][cells[0]] ^ self.zobrist[4 + player][cells[-1]]
+            self.bodies.append(cells)
+    
+    def choose(self, game, snake, opponent, obstacles, foods, budget):
+        """Arah terbaik untuk snake melawan opponent dalam anggaran waktu (detik)"""
+        # Anggaran juga mencakup persiapan (BFS makanan dan array tembok)
+        self.deadline = time.perf_counter() + budget
+        self.prepare(game, obstacles, foods, (snake, opponent))
+        self.nodes = 0
+        self.depth_reached = 0
+        moves = self.moves(0)
+        if not moves:
+            return None
+        best_move = moves[0]
+        depth = 2
+        try:
+            while depth <= 64:
+                value, move = self.root(depth, best_move)
+                best_move = move
+                self.depth_reached = depth
+                if abs(value) >= self.WIN:
+                    break
+                depth += 2
+        except SearchTimeout:
+            pass
+        
+        head = self.bodies[0][0]
+        delta = best_move - head
+        for direction, (dy, dx) in DIRECTION_DELTAS.items():
+            if dy * self.cols + dx == delta:
+                return direction
+        return None
+    
+    def moves(self, player):
+        # Semua langkah kecuali berbalik ke leher
+        body = self.bodies[player]
+        head = body[0]
+        neck = body[1] if len(body) > 1 else None
+        return [head + offset for offset in self.offsets if head + offset != neck]
+    
+    def root(self, depth, first):
+        moves = self.moves(0)
+        moves.sort(key=lambda m: m != first)
+        alpha, best_value, best_move = -self.WIN * 2, -self.WIN * 2, moves[0]
+        for move in moves:
+            value = self.respond(depth, move, alpha, self.WIN * 2)
+            if value > best_value:
+                best_value, best_move = value, move
+            alpha = max(alpha, value)
+        return best_value, best_move
+    
+    def search(self, depth, alpha, beta):
+        self.nodes += 1
+        if self.nodes & 127 == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        if depth <= 0:
+            return self.evaluate()
+        
+        entry = self.table[self.key & self.table_mask]
+        hint = None
+        if entry is not None and entry[0] == self.key:
+            _, entry_depth, value, flag, hint = entry
+            if entry_depth >= depth:
+                if flag == self.EXACT:
+                    return value
+                if flag == self.LOWER and value >= beta:
+                    return value
+                if flag == self.UPPER and value <= alpha:
+                    return value
+        
+        moves = self.moves(0)
+        if hint is not None:
+            moves.sort(key=lambda m: m != hint)
+        original_alpha = alpha
+        best_value, best_move = -self.WIN * 2, moves[0]
+        for move in moves:
+            value = self.respond(depth, move, alpha, beta)
+            if value > best_value:
+                best_value, best_move = value, move
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+        
+        flag = self.EXACT
+        if best_value <= original_alpha:
+            flag = self.UPPER
+        elif best_value >= beta:
+            flag = self.LOWER
+        self.table[self.key & self.table_mask] = (self.key, depth, best_value, flag, best_move)
+        return best_value
+    
+    def respond(self, depth, move, alpha, beta):
+        # Lawan memilih jawaban terburuk bagi AI
+        best_value = self.WIN * 2
+        for reply in self.moves(1):
+            value = self.play(depth, move, reply, alpha, beta)
+            best_value = min(best_value, value)
+            beta = min(beta, value)
+            if alpha >= beta:
+                break
+        return best_value
+    
+    def play(self, depth, move, reply, alpha, beta):
+        walls, occ = self.walls, self.occ
+        me_dead = walls[move] or occ[move]
+        opponent_dead = walls[reply] or occ[reply]
+        if me_dead or opponent_dead or move == reply:
+            if (me_dead and opponent_dead) or move == reply:
+                return 0
+            # Kemenangan lebih cepat dan kekalahan lebih lambat lebih disukai
+            return -self.WIN - depth if me_dead else self.WIN + depth
+        
+        zobrist = self.zobrist
+        mine, theirs = self.bodies
+        head_mine, head_theirs = mine[0], theirs[0]
+        tail_mine, tail_theirs = mine.pop(), theirs.pop()
+        occ[tail_mine] -= 1
+        occ[tail_theirs] -= 1
+        mine.appendleft(move)
+        theirs.appendleft(reply)
+        occ[move] += 1
+        occ[reply] += 1
+        delta = (zobrist[0][tail_mine] ^ zobrist[0][move] ^
+                 zobrist[1][tail_theirs] ^ zobrist[1][reply] ^
+                 zobrist[2][head_mine] ^ zobrist[2][move] ^
+                 zobrist[3][head_theirs] ^ zobrist[3][reply] ^
+                 zobrist[4][tail_mine] ^ zobrist[4][mine[-1]] ^
+                 zobrist[5][tail_theirs] ^ zobrist[5][theirs[-1]])
+        self.key ^= delta
+        try:
+            return self.search(depth - 2, alpha, beta)
+        finally:
+            self.key ^= delta
+            occ[move] -= 1
+            occ[reply] -= 1
+            mine.popleft()
+            theirs.popleft()
+            mine.append(tail_mine)
+            theirs.append(tail_theirs)
+            occ[tail_mine] += 1
+            occ[tail_theirs] += 1
+    
+    def evaluate(self):
+        walls, occ = self.walls, self.occ
+        mine, theirs = self.bodies[0][0], self.bodies[1][0]
+        free_mine = free_theirs = 0
+        for offset in self.offsets:
+            if not walls[mine + offset] and not occ[mine + offset]:
+                free_mine += 1
+            if not walls[theirs + offset] and not occ[theirs + offset]:
+                free_theirs += 1
+        return 20 * (free_mine - free_theirs) + self.food_dist[theirs] - self.food_dist[mine]
+
+# Kode 2-bit untuk langkah antar sel bersebelahan di file rekaman
+STEP_DELTAS = tuple(DIRECTION_DELTAS.values())
+STEP_CODES = {delta: code for code, delta in enumerate(STEP_DELTAS)}
+
+class MatchRecorder:
+    """Rekaman satu level: keyframe penuh setiap `interval` tick plus delta per tick.
+
+    File berisi MAGIC, header JSON satu baris, lalu chunk zlib (panjang 4 byte
+    + data) yang masing-masing diawali keyframe. Footer JSON di akhir file
+    menyimpan offset setiap chunk, sehingga seek cukup membuka satu chunk dan
+    menerapkan paling banyak `interval` delta.
+
+    Delta satu tick: byte flag, jarak waktu dari tick sebelumnya (mikrodetik
+    waktu MoveScheduler) hanya jika berbeda dari jarak sebelumnya, satu byte
+    per ular (arah kepala baru 2 bit, ekor dilepas, bergerak), lalu skor dan
+    event item (makanan, bonus, power-up, rintangan bergerak) hanya jika
+    berubah. Tick adalah event scheduler untuk ular mana pun yang jatuh
+    tempo, jadi jaraknya tidak selalu satu game_speed.
+    """
+    
+    MAGIC = b"SNKREC3\n"  # versi 3: waktu scheduler per tick
+    END = b"SNKEND\n"
+    SCORE, ITEMS, TIME = 1, 2, 4
+    MOVED, TAIL = 8, 4
+    # Jenis item; indeks 0 adalah makanan biasa
+    KINDS = (None, BonusFood, SpeedBoost, MovingObstacle)
+    
+    def __init__(self, path, header, interval=256):
+        self.file = open(path, "wb")
+        self.interval = interval
+        self.file.write(self.MAGIC)
+        self.file.write(json.dumps(dict(header, interval=interval)).encode() + b"\n")
+        self.chunks = []
+        self.chunk = None
+        self.tick = -1
+        self.heads = []
+        self.lengths = []
+        self.items = {}
+        self.score = None
+        self.time = 0
+        self.gap = 0
+    
+    def frame(self, tick, snakes, items, score, food_count, now):
+        """Catat keadaan setelah tick pada waktu scheduler now (mikrodetik).
+        
+        Tick harus berurutan tanpa loncatan.
+        """
+        if self.chunk is None or tick % self.interval == 0:
+            if self.tick >= 0:
+                self.gap = now - self.time
+            self.flush()
+            self.chunks.append([tick, self.file.tell()])
+            self.chunk = self.keyframe(tick, now, snakes, items, score, food_count)
+        else:
+            self.chunk += self.delta(now, snakes, items, score, food_count)
+        self.tick = tick
+        self.time = now
+        self.heads = [tuple(snake[0]) if snake else None for snake in snakes]
+        self.lengths = [len(snake) for snake in snakes]
+        self.items = items
+        self.score = (score, food_count)
+    
+    def keyframe(self, tick, now, snakes, items, score, food_count):
+        data = bytearray(struct.pack(">IQIIIB", tick, now, self.gap, score, food_count, len(snakes)))
+        for snake in snakes:
+            data += struct.pack(">I", len(snake))
+            if not snake:
+                continue
+            data += struct.pack(">HH", snake[0][0], snake[0][1])
+            # Tubuh disimpan sebagai langkah dari kepala ke ekor, 4 langkah per byte
+            codes = [STEP_CODES[(b[0] - a[0], b[1] - a[1])] for a, b in zip(snake, snake[1:])]
+            for i in range(0, len(codes), 4):
+                data.append(sum(code << (2 * j) for j, code in enumerate(codes[i:i + 4])))
+        data += struct.pack(">I", len(items))
+        for (y, x), kind in items.items():
+            data += struct.pack(">BHH", kind, y, x)
+        return data
+    
+    def delta(self, now, snakes, items, score, food_count):
+        flags = 0
+        data = bytearray()
+        # Jarak waktu hanya ditulis saat berubah (kecepatan ular, power-up)
+        if now - self.time != self.gap:
+            self.gap = now - self.time
+            flags |= self.TIME
+            data += struct.pack(">I", self.gap)
+        for i, snake in enumerate(snakes):
+            head = self.heads[i] if i < len(self.heads) else None
+            if not snake or head is None or tuple(snake[0]) == head:
+                data.append(0)
+                continue
+            move = self.MOVED | STEP_CODES[(snake[0][0] - head[0], snake[0][1] - head[1])]
+            if len(snake) == self.lengths[i]:
+                move |= self.TAIL
+            data.append(move)
+        
+        if (score, food_count) != self.score:
+            flags |= self.SCORE
+            data += struct.pack(">II", score, food_count)
+        
+        # Item yang hilang dikirim sebelum item yang muncul
+        events = [(0, cell) for cell, kind in self.items.items() if items.get(cell) != kind]
+        events += [(0x80 | kind, cell) for cell, kind in items.items() if self.items.get(cell) != kind]
+        if events:
+            flags |= self.ITEMS
+            data += struct.pack(">H", len(events))
+            for op, (y, x) in events:
+                data += struct.pack(">BHH", op, y, x)
+        return bytes([flags]) + data
+    
+    def flush(self):
+        if self.chunk:
+            compressed = zlib.compress(bytes(self.chunk), 6)
+            self.file.write(struct.pack(">I", len(compressed)) + compressed)
+        self.chunk = None
+    
+    def close(self, result):
+        self.flush()
+        footer_offset = self.file.tell()
+        footer = {"ticks": self.tick, "result": result, "chunks": self.chunks}
+        self.file.write(json.dumps(footer).encode())
+        self.file.write(struct.pack(">Q", footer_offset) + self.END)
+        self.file.close()
+
+class MatchReplay:
+    """Pembaca rekaman MatchRecorder dengan step maju dan seek ke tick mana pun"""
+    
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = data = f.read()
+        magic = MatchRecorder.MAGIC
+        if not data.startswith(magic):
+            if data.startswith(magic[:6]):
+                raise ValueError(f"{path} uses an unsupported recording version")
+            raise ValueError(f"{path} is not a snake recording")
+        header_end = data.index(b"\n", len(magic))
+        self.header = json.loads(data[len(magic):header_end])
+        self.interval = self.header["interval"]
+        
+        trailer = 8 + len(MatchRecorder.END)
+        if data.endswith(MatchRecorder.END):
+            footer_offset, = struct.unpack(">Q", data[-trailer:-len(MatchRecorder.END)])
+            footer = json.loads(data[footer_offset:-trailer])
+            self.result = footer["result"]
+            chunks = footer["chunks"]
+        else:
+            # Rekaman terpotong (proses dihentikan paksa): indeks dibangun ulang
+            self.result = None
+            chunks = self.scan(header_end + 1)
+        if not chunks:
+            raise ValueError(f"{path} contains no frames")
+        self.chunk_ticks = [tick for tick, _ in chunks]
+        self.chunk_offsets = [offset for _, offset in chunks]
+        
+        # Tick terakhir dihitung dari chunk terakhir
+        self.load_chunk(len(self.chunk_offsets) - 1)
+        while self.step():
+            pass
+        self.end_tick = self.tick
+        self.load_chunk(0)
+    
+    def scan(self, offset):
+        chunks = []
+        while offset + 4 <= len(self.data):
+            size, = struct.unpack_from(">I", self.data, offset)
+            try:
+                payload = zlib.decompress(self.data[offset + 4:offset + 4 + size])
+            except zlib.error:
+                break
+            chunks.append([struct.unpack_from(">I", payload)[0], offset])
+            offset += 4 + size
+        return chunks
+    
+    def load_chunk(self, index):
+        data = self.data
+        offset = self.chunk_offsets[index]
+        size, = struct.unpack_from(">I", data, offset)
+        payload = zlib.decompress(data[offset + 4:offset + 4 + size])
+        self.tick, self.time, self.gap, self.score, self.food_count, count = struct.unpack_from(">IQIIIB", payload)
+        pos = 25
+        self.snakes = []
+        for _ in range(count):
+            length, = struct.unpack_from(">I", payload, pos)
+            pos += 4
+            snake = deque()
+            if length:
+                y, x = struct.unpack_from(">HH", payload, pos)
+                pos += 4
+                snake.append((y, x))
+                for i in range(length - 1):
+                    dy, dx = STEP_DELTAS[payload[pos + i // 4] >> (2 * (i % 4)) & 3]
+                    y, x = y + dy, x + dx
+                    snake.append((y, x))
+                pos += (length + 2) // 4
+            self.snakes.append(snake)
+        count, = struct.unpack_from(">I", payload, pos)
+        pos += 4
+        self.items = {}
+        for _ in range(count):
+            kind, y, x = struct.unpack_from(">BHH", payload, pos)
+            pos += 5
+            self.items[(y, x)] = kind
+        self.chunk_index = index
+        self.payload = payload
+        self.pos = pos
+    
+    def step(self):
+        """Maju satu tick; False jika rekaman sudah habis"""
+        if self.pos < len(self.payload):
+            self.apply_delta()
+        elif self.chunk_index + 1 < len(self.chunk_offsets):
+            self.load_chunk(self.chunk_index + 1)
+        else:
+            return False
+        return True
+    
+    def apply_delta(self):
+        payload, pos = self.payload, self.pos
+        flags = payload[pos]
+        pos += 1
+        if flags & MatchRecorder.TIME:
+            self.gap, = struct.unpack_from(">I", payload, pos)
+            pos += 4
+        self.time += self.gap
+        for snake in self.snakes:
+            move = payload[pos]
+            pos += 1
+            if move & MatchRecorder.MOVED:
+                dy, dx = STEP_DELTAS[move & 3]
+                y, x = snake[0]
+                snake.appendleft((y + dy, x + dx))
+                if move & MatchRecorder.TAIL:
+                    snake.pop()
+        if flags & MatchRecorder.SCORE:
+            self.score, self.food_count = struct.unpack_from(">II", payload, pos)
+            pos += 8
+        if flags & MatchRecorder.ITEMS:
+            count, = struct.unpack_from(">H", payload, pos)
+            pos += 2
+            for _ in range(count):
+                op, y, x = struct.unpack_from(">BHH", payload, pos)
+                pos += 5
+                if op & 0x80:
+                    self.items[(y, x)] = op & 0x7f
+                else:
+                    self.items.pop((y, x), None)
+        self.tick += 1
+        self.pos = pos
+    
+    def next_time(self):
+        """Waktu scheduler (mikrodetik) tick berikutnya, atau None jika rekaman habis"""
+        if self.pos < len(self.payload):
+            if self.payload[self.pos] & MatchRecorder.TIME:
+                return self.time + struct.unpack_from(">I", self.payload, self.pos + 1)[0]
+            return self.time + self.gap
+        if self.chunk_index + 1 < len(self.chunk_offsets):
+            # Tick berikutnya adalah keyframe chunk selanjutnya
+            offset = self.chunk_offsets[self.chunk_index + 1]
+            size, = struct.unpack_from(">I", self.data, offset)
+            payload = zlib.decompress(self.data[offset + 4:offset + 4 + size])
+            return struct.unpack_from(">Q", payload, 4)[0]
+        return None
+    
+    def seek(self, tick):
+        """Lompat ke tick: buka chunk yang memuatnya lalu terapkan delta sisanya"""
+        tick = max(0, min(tick, self.end_tick))
+        index = bisect.bisect_right(self.chunk_ticks, tick) - 1
+        if index != self.chunk_index or self.tick > tick:
+            self.load_chunk(max(0, index))
+        while self.tick < tick and self.step():
+            pass
+
+class BotProcess:
+    __slots__ = ("player", "process", "output", "buffer", "move", "alive", "writing", "timeouts")
+    
+    def __init__(self, player, process):
+        self.player = player
+        self.process = process
+        self.output = bytearray()
+        self.buffer = bytearray()
+        self.move = None
+        self.alive = True
+        self.writing = False
+        self.timeouts = 0
+
+class BotPool:
+    """Bot eksternal: program terpisah yang bermain lewat pipe stdin/stdout.
+    
+    Protokol berupa JSON lines. Di awal level bot menerima pesan "start"
+    berisi keadaan lengkap (dinding, tubuh ular, item) dan nomor pemainnya
+    ("you"). Setiap tick setelahnya hanya berisi delta terhadap tick
+    sebelumnya: "m" = [pemain, y, x, tumbuh] untuk ular yang bergerak, "i" =
+    [y, x, jenis] untuk item yang muncul/berubah dan "r" = [y, x] untuk item
+    yang hilang. Bot menjawab {"t": tick, "move": "up"}; jawaban yang tidak
+    datang sebelum deadline (atau untuk tick lama) diabaikan dan ularnya
+    tetap berjalan lurus. Level diakhiri pesan "end".
+    
+    Semua pipe non-blocking dan dimultipleks dengan satu selector, jadi bot
+    yang lambat tidak menahan bot lain; tick game paling lama menunggu
+    sampai deadline. stderr bot dibuang agar tidak merusak layar.
+    """
+    
+    MOVES = {"up": Direction.UP, "down": Direction.DOWN, "left": Direction.LEFT, "right": Direction.RIGHT}
+    KINDS = ("food", "bonus", "boost", "hazard")
+    MAX_BACKLOG = 1 << 20
+    
+    def __init__(self, commands, timeout=0.1):
+        self.selector = selectors.DefaultSelector()
+        self.timeout = timeout
+        self.bots = {}
+        for player, command in commands.items():
+            process = subprocess.Popen(shlex.split(command), stdin=subprocess.PIPE,
+                                       stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            os.set_blocking(process.stdin.fileno(), False)
+            os.set_blocking(process.stdout.fileno(), False)
+            bot = BotProcess(player, process)
+            self.bots[player] = bot
+            self.selector.register(process.stdout, selectors.EVENT_READ, bot)
+        self.active = []
+        self.tick = None
+        self.heads = []
+        self.lengths = []
+        self.items = {}
+    
+    def start(self, players, state, snakes, items):
+        """Kirim keadaan lengkap level baru ke bot untuk pemain yang bermain"""
+        self.active = [self.bots[player] for player in players]
+        self.tick = None
+        self.remember(snakes, items)
+        message = dict(state, type="start", kinds=self.KINDS,
+                       snakes=[[list(cell) for cell in snake] for snake in snakes],
+                       items=[[y, x, kind] for (y, x), kind in sorted(items.items())])
+        for bot in self.active:
+            self.queue(bot, dict(message, you=bot.player))
+    
+    def remember(self, snakes, items):
+        self.heads = [tuple(snake[0]) if snake else None for snake in snakes]
+        self.lengths = [len(snake) for snake in snakes]
+        self.items = items
+    
+    def send_tick(self, tick, snakes, items):
+        """Kirim delta tick ke semua bot aktif; jawaban lama dibuang"""
+        message = {"type": "tick", "t": tick}
+        moved = []
+        for player, snake in enumerate(snakes, 1):
+            if snake and tuple(snake[0]) != self.heads[player - 1]:
+                moved.append([player, snake[0][0], snake[0][1], int(len(snake) > self.lengths[player - 1])])
+        if moved:
+            message["m"] = moved
+        added = [[y, x, kind] for (y, x), kind in items.items() if self.items.get((y, x)) != kind]
+        removed = [[y, x] for (y, x) in self.items if (y, x) not in items]
+        if added:
+            message["i"] = added
+        if removed:
+            message["r"] = removed
+        self.remember(snakes, items)
+        self.tick = tick
+        for bot in self.active:
+            bot.move = None
+            self.queue(bot, message)
+    
+    def collect(self, deadline):
+        """Tunggu jawaban semua bot aktif sampai deadline (perf_counter).
+        
+        Mengembalikan {pemain: Direction} untuk bot yang menjawab tepat waktu.
+        """
+        while True:
+            waiting = [bot for bot in self.active if bot.alive and (bot.move is None or bot.output)]
+            timeout = deadline - time.perf_counter()
+            if not waiting or timeout <= 0:
+                break
+            for key, events in self.selector.select(timeout):
+                bot = key.data
+                if key.fileobj is bot.process.stdout:
+                    self.read(bot)
+                elif bot.alive:
+                    self.flush(bot)
+        
+        moves = {}
+        for bot in self.active:
+            if bot.move is None:
+                # Bot yang sudah keluar tidak dihitung terlambat lagi
+                if bot.alive:
+                    bot.timeouts += 1
+            else:
+                moves[bot.player] = bot.move
+        return moves
+    
+    def end(self, result):
+        for bot in self.active:
+            self.queue(bot, {"type": "end", "result": result})
+        self.active = []
+    
+    def queue(self, bot, message):
+        if not bot.alive:
+            return
+        bot.output += json.dumps(message, separators=(",", ":")).encode() + b"\n"
+        if len(bot.output) > self.MAX_BACKLOG:
+            # Bot tidak pernah membaca stdin-nya
+            self.drop(bot)
+        elif not bot.writing:
+            self.flush(bot)
+    
+    def flush(self, bot):
+        try:
+            written = os.write(bot.process.stdin.fileno(), bot.output)
+        except BlockingIOError:
+            written = 0
+        except OSError:
+            self.drop(bot)
+            return
+        del bot.output[:written]
+        # Sisa data dikirim saat pipe siap ditulis lagi
+        if bot.output and not bot.writing:
+            self.selector.register(bot.process.stdin, selectors.EVENT_WRITE, bot)
+            bot.writing = True
+        elif not bot.output and bot.writing:
+            self.selector.unregister(bot.process.stdin)
+            bot.writing = False
+    
+    def read(self, bot):
+        try:
+            data = os.read(bot.process.stdout.fileno(), 65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self.drop(bot)
+            return
+        bot.buffer += data
+        lines = bot.buffer.split(b"\n")
+        bot.buffer = lines.pop()
+        for line in lines:
+            try:
+                reply = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(reply, dict) and reply.get("t") == self.tick and reply.get("move") in self.MOVES:
+                bot.move = self.MOVES[reply["move"]]
+    
+    def drop(self, bot):
+        """Bot keluar atau macet: ularnya terus berjalan lurus"""
+        if not bot.alive:
+            return
+        bot.alive = False
+        self.selector.unregister(bot.process.stdout)
+        if bot.writing:
+            self.selector.unregister(bot.process.stdin)
+            bot.writing = False
+        bot.output.clear()
+    
+    def close(self):
+        for bot in self.bots.values():
+            self.drop(bot)
+            try:
+                bot.process.stdin.close()
+            except OSError:
+                pass
+        # EOF di stdin adalah sinyal berhenti; bot yang tidak keluar dimatikan
+        deadline = time.perf_counter() + 1.0
+        for bot in self.bots.values():
+            try:
+                bot.process.wait(max(0, deadline - time.perf_counter()))
+            except subprocess.TimeoutExpired:
+                bot.process.kill()
+                bot.process.wait()
+            bot.process.stdout.close()
+        self.selector.close()
+
 class SnakeGame:
     def __init__(self):
         self.screen = None
@@ -61,7 +1470,36 @@ class SnakeGame:
         self.difficulty = "NORMAL"
         self.sound_enabled = True
         self.high_scores = []
-        
+        self.color_attrs = {}
+        self.telemetry = None
+        self.autopilot = False
+        self.cycle_cache = {}
+        self.cycle_uncovered = 0
+        self.snake_speeds = [1.0, 1.0]
+        self.food_items = 1
+        self.ai_player2 = False
+        self.ai = SnakeAI()
+        self.record_dir = None
+        self.recorder = None
+        self.replay_path = None
+        self.asciicast = None
+        self.regions = None
+        self.term_size = (self.max_y, self.max_x)
+        self.origin = (0, 0)
+        self.templates = {}
+        self.captured = None
+        self.current_screen = None
+        self.resized = False
+        self.stdin_attrs = None
+        self.bots = None
+        # Indeks makanan level yang sedang dimainkan (dibaca harness seperti soak.py)
+        self.foods = None
+        
+    def emit(self, event, **fields):
+        # Catat event telemetry jika diaktifkan
+        if self.telemetry:
+            self.telemetry.emit(event, **fields)
+    
     def init_colors(self):
         if HAS_CURSES and not self.colors_initialized:
             curses.start_color()
@@ -85,18 +1523,75 @@ class SnakeGame:
             curses.curs_set(0)
             self.screen.keypad(True)
             self.screen.nodelay(1)
-            self.max_y, self.max_x = self.screen.getmaxyx()
-            # Pastikan ukuran layar minimum
-            if self.max_y < 20 or self.max_x < 40:
-                self.max_y, self.max_x = 20, 40
-            self.game_area_bottom = self.max_y - 3
-            self.game_area_right = self.max_x - 2
+            self.term_size = self.screen.getmaxyx()
+            self.set_screen_size(*self.term_size)
             self.init_colors()
         else:
             # Fallback untuk Windows/Termux
+            self.term_size = (20, 40)
+            self.set_screen_size(20, 40)
+            # Di terminal POSIX tombol dibaca langsung tanpa menunggu Enter
+            if termios and sys.stdin.isatty():
+                self.stdin_attrs = termios.tcgetattr(sys.stdin)
+                tty.setcbreak(sys.stdin)
+    
+    def set_screen_size(self, rows, cols):
+        self.max_y, self.max_x = rows, cols
+        # Pastikan ukuran layar minimum
+        if self.max_y < 20 or self.max_x < 40:
             self.max_y, self.max_x = 20, 40
-            self.game_area_bottom = self.max_y - 3
-            self.game_area_right = self.max_x - 2
+        self.game_area_bottom = self.max_y - 3
+        self.game_area_right = self.max_x - 2
+        self.update_origin()
+    
+    def update_origin(self):
+        # Kanvas (max_y x max_x) dipusatkan jika terminal lebih besar
+        rows, cols = self.term_size
+        self.origin = (max(0, (rows - self.max_y) // 2), max(0, (cols - self.max_x) // 2))
+    
+    def handle_resize(self):
+        """Terminal berubah ukuran.
+
+        Layar menu di-layout ulang ke ukuran baru (dari cache jika ukuran itu
+        pernah dipakai). Layar yang menggambar sendiri setiap frame (game,
+        replay) tetap memakai kanvasnya dan hanya dipusatkan ulang; level
+        berikutnya dimulai dengan ukuran terminal yang baru.
+        """
+        self.term_size = self.screen.getmaxyx()
+        self.resized = True
+        if self.current_screen:
+            name, layout, state = self.current_screen
+            self.show_screen(name, layout, *state)
+        else:
+            self.update_origin()
+    
+    def show_screen(self, name, layout, *state):
+        """Gambar layar menu dari template yang di-cache.
+
+        layout() hanya dijalankan sekali per (ukuran terminal, state): panggilan
+        draw_text di dalamnya direkam sebagai run teks berposisi, lalu setiap
+        tampilan berikutnya cukup memutar ulang run tersebut.
+        """
+        self.set_screen_size(*self.term_size)
+        key = (name, self.max_y, self.max_x) + state
+        runs = self.templates.get(key)
+        if runs is None:
+            if len(self.templates) >= 256:
+                self.templates.clear()
+            self.captured = []
+            try:
+                layout()
+            finally:
+                runs, self.captured = self.captured, None
+            self.templates[key] = runs
+        self.current_screen = (name, layout, state)
+        
+        self.clear_screen()
+        if HAS_CURSES:
+            self.screen.clear()
+        for y, x, text, color in runs:
+            self.draw_text(y, x, text, color)
+        self.refresh_screen()
     
     def cleanup_screen(self):
         if HAS_CURSES and self.screen:
@@ -106,11 +1601,27 @@ class SnakeGame:
             curses.endwin()
         else:
             self.clear_screen()
+            if self.stdin_attrs is not None:
+                termios.tcsetattr(sys.stdin, termios.TCSADRAIN, self.stdin_attrs)
+                self.stdin_attrs = None
     
-    def get_input(self):
+    def get_input(self, timeout=-1):
+        """Tombol berikutnya; tunggu paling lama timeout ms (negatif = sampai ada tombol)"""
         if HAS_CURSES:
-            self.screen.timeout(100)
-            return self.screen.getch()
+            self.screen.timeout(timeout)
+            key = self.screen.getch()
+            if key == curses.KEY_RESIZE:
+                self.handle_resize()
+                return -1
+            return key
+        elif self.stdin_attrs is not None:
+            # Fallback input untuk Linux/Termux: tunggu satu byte sampai timeout
+            ready, _, _ = select.select([sys.stdin], [], [], None if timeout < 0 else timeout / 1000)
+            if ready:
+                data = os.read(sys.stdin.fileno(), 1)
+                if data:
+                    return data[0]
+            return -1
         else:
             # Fallback input untuk Windows/Termux
             try:
@@ -122,6 +1633,10 @@ class SnakeGame:
                 pass
             return -1
     
+    def sleep(self, seconds):
+        # Dipisah agar host multi-sesi bisa menjadwalkan tidur di event loop-nya
+        time.sleep(seconds)
+    
     def draw_text(self, y, x, text, color_code=0, centered=False):
         if centered:
             x = max(0, self.max_x // 2 - len(text) // 2)
@@ -129,29 +1644,60 @@ class SnakeGame:
         # Pastikan koordinat berada dalam batas layar
         if y < 0 or y >= self.max_y or x < 0 or x >= self.max_x:
             return
-            
+        
+        # Sedang merekam template layar
+        if self.captured is not None:
+            self.captured.append((y, x, text, color_code))
+            return
+        
+        y += self.origin[0]
+        x += self.origin[1]
+        if self.asciicast:
+            self.asciicast.draw(y, x, text, color_code)
+        self.write_text(y, x, text, color_code)
+    
+    def write_text(self, y, x, text, color_code):
+        # Tulis ke backend pada koordinat layar absolut
         if HAS_CURSES:
             try:
                 if color_code > 0:
-                    self.screen.addstr(y, x, text, curses.color_pair(color_code))
+                    self.screen.addstr(y, x, text, self.color_attr(color_code))
                 else:
                     self.screen.addstr(y, x, text)
             except curses.error:
                 pass
         else:
             # Fallback untuk Windows/Termux - dengan warna ANSI
-            color_codes = {
-                0: "",      # Default
-                1: "\033[91m", # Red
-                2: "\033[92m", # Green
-                3: "\033[93m", # Yellow
-                4: "\033[94m", # Blue
-                5: "\033[95m", # Magenta
-                6: "\033[96m", # Cyan
-                7: "\033[97m", # White
-            }
-            reset = "\033[0m"
-            print(f"{color_codes.get(color_code, '')}\033[{y};{x}H{text}{reset}")
+            print(f"{ANSI_COLORS.get(color_code, '')}\033[{y};{x}H{text}{ANSI_RESET}")
+    
+    def color_attr(self, color_code):
+        # Simpan atribut color_pair agar tidak dicari ulang di setiap sel
+        attr = self.color_attrs.get(color_code)
+        if attr is None:
+            attr = curses.color_pair(color_code)
+            self.color_attrs[color_code] = attr
+        return attr
+    
+    def draw_cells(self, cells):
+        """Gambar sel frame {(y, x): (char, color)} sebagai run horizontal.
+
+        Sel bersebelahan di baris yang sama dengan warna yang sama digabung
+        menjadi satu string sehingga hanya ada satu addstr per run.
+        """
+        run_y = run_x = run_color = next_x = None
+        run_chars = []
+        for y, x in sorted(cells):
+            char, color = cells[(y, x)]
+            if y == run_y and x == next_x and color == run_color:
+                run_chars.append(char)
+            else:
+                if run_chars:
+                    self.draw_text(run_y, run_x, ''.join(run_chars), run_color)
+                run_y, run_x, run_color = y, x, color
+                run_chars = [char]
+            next_x = x + 1
+        if run_chars:
+            self.draw_text(run_y, run_x, ''.join(run_chars), run_color)
     
     def draw_box(self, y, x, height, width, color=Colors.CYAN):
         # Pastikan kotak muat di layar
@@ -168,6 +1714,8 @@ class SnakeGame:
         self.draw_text(y + height - 1, x, "╚" + "═" * (width - 2) + "╝", color)
     
     def refresh_screen(self):
+        if self.asciicast:
+            self.asciicast.frame(max(self.term_size[0], self.max_y), max(self.term_size[1], self.max_x))
         if HAS_CURSES:
             self.screen.refresh()
         else:
@@ -195,11 +1743,7 @@ class SnakeGame:
         for i, line in enumerate(ascii_art):
             self.draw_text(2 + i, 0, line, Colors.GREEN, centered=True)
     
-    def show_menu(self):
-        self.clear_screen()
-        if HAS_CURSES:
-            self.screen.clear()
-        
+    def layout_menu(self):
         self.show_ascii_art()
         
         # Menu yang responsif berdasarkan ukuran layar
@@ -262,7 +1806,9 @@ class SnakeGame:
                 self.draw_text(info_box_y + 3 + i, 0, instruction, Colors.WHITE, centered=True)
         
         self.draw_text(box_y + box_height - 1, 0, "Select option (1-5): ", Colors.CYAN, centered=True)
-        self.refresh_screen()
+    
+    def show_menu(self):
+        self.show_screen("menu", self.layout_menu)
         
         while True:
             key = self.get_input()
@@ -281,8 +1827,7 @@ class SnakeGame:
             elif key == ord('q') or key == ord('Q'):
                 sys.exit(0)
     
-    def show_settings(self):
-        self.clear_screen()
+    def layout_settings(self):
         self.draw_text(5, 0, "⚙️ GAME SETTINGS", Colors.MAGENTA, centered=True)
         
         # Settings menu yang responsif
@@ -320,7 +1865,10 @@ class SnakeGame:
         self.draw_text(status_y + 1, 0, f"Difficulty: {self.difficulty}, Sound: {'ON' if self.sound_enabled else 'OFF'}", Colors.WHITE, centered=True)
         
         self.draw_text(status_y + 3, 0, "Select option (1-5): ", Colors.CYAN, centered=True)
-        self.refresh_screen()
+    
+    def show_settings(self):
+        self.show_screen("settings", self.layout_settings,
+                         self.snake_char, self.level, self.difficulty, self.sound_enabled)
         
         while True:
             key = self.get_input()
@@ -341,8 +1889,7 @@ class SnakeGame:
             elif key == ord('q') or key == ord('Q'):
                 return GameState.MENU
     
-    def change_character(self):
-        self.clear_screen()
+    def layout_characters(self):
         self.draw_text(5, 0, "🎨 SELECT SNAKE CHARACTER", Colors.MAGENTA, centered=True)
         
         # Karakter yang responsif
@@ -377,7 +1924,9 @@ class SnakeGame:
             self.draw_text(box_y + 2 + i, 0, char, color, centered=True)
         
         self.draw_text(box_y + box_height - 1, 0, "Select character (1-6) or Q to cancel: ", Colors.CYAN, centered=True)
-        self.refresh_screen()
+    
+    def change_character(self):
+        self.show_screen("characters", self.layout_characters)
         
         while True:
             key = self.get_input()
@@ -388,8 +1937,7 @@ class SnakeGame:
             elif key == ord('q') or key == ord('Q'):
                 break
     
-    def difficulty_settings(self):
-        self.clear_screen()
+    def layout_difficulty(self):
         self.draw_text(5, 0, "🎯 DIFFICULTY SETTINGS", Colors.MAGENTA, centered=True)
         
         box_width = min(40, self.max_x - 4)
@@ -411,7 +1959,9 @@ class SnakeGame:
         
         self.draw_text(box_y + 6, 0, f"Current: {self.difficulty}", Colors.WHITE, centered=True)
         self.draw_text(box_y + 7, 0, "Select difficulty (1-4): ", Colors.CYAN, centered=True)
-        self.refresh_screen()
+    
+    def difficulty_settings(self):
+        self.show_screen("difficulty", self.layout_difficulty, self.difficulty)
         
         while True:
             key = self.get_input()
@@ -434,8 +1984,7 @@ class SnakeGame:
             elif key == ord('q') or key == ord('Q'):
                 break
     
-    def level_select(self):
-        self.clear_screen()
+    def layout_levels(self):
         self.draw_text(5, 0, "📊 SELECT LEVEL", Colors.MAGENTA, centered=True)
         
         box_width = min(50, self.max_x - 4)
@@ -458,7 +2007,9 @@ class SnakeGame:
         
         self.draw_text(box_y + 8, 0, f"Current Level: {self.level}", Colors.WHITE, centered=True)
         self.draw_text(box_y + 9, 0, "Select level (1-5): ", Colors.CYAN, centered=True)
-        self.refresh_screen()
+    
+    def level_select(self):
+        self.show_screen("levels", self.layout_levels, self.level)
         
         while True:
             key = self.get_input()
@@ -468,20 +2019,9 @@ class SnakeGame:
             elif key == ord('q') or key == ord('Q'):
                 break
     
-    def show_high_scores(self):
-        self.clear_screen()
+    def layout_high_scores(self):
         self.draw_text(5, 0, "🏆 HIGH SCORES", Colors.MAGENTA, centered=True)
         
-        # Generate some sample high scores if empty
-        if not self.high_scores:
-            self.high_scores = [
-                {"name": "CHAMP", "score": 1000, "level": 5},
-                {"name": "PRO", "score": 800, "level": 4},
-                {"name": "PLAYER", "score": 600, "level": 3},
-                {"name": "BEGINNER", "score": 400, "level": 2},
-                {"name": "NEWBIE", "score": 200, "level": 1},
-            ]
-        
         box_width = min(50, self.max_x - 4)
         box_height = len(self.high_scores) + 4
         box_x = max(0, self.max_x // 2 - box_width // 2)
@@ -506,11 +2046,24 @@ class SnakeGame:
             self.draw_text(box_y + 3 + i, 0, score_text, color, centered=True)
         
         self.draw_text(box_y + box_height - 1, 0, "Press any key to return to menu", Colors.CYAN, centered=True)
-        self.refresh_screen()
+    
+    def show_high_scores(self):
+        # Generate some sample high scores if empty
+        if not self.high_scores:
+            self.high_scores = [
+                {"name": "CHAMP", "score": 1000, "level": 5},
+                {"name": "PRO", "score": 800, "level": 4},
+                {"name": "PLAYER", "score": 600, "level": 3},
+                {"name": "BEGINNER", "score": 400, "level": 2},
+                {"name": "NEWBIE", "score": 200, "level": 1},
+            ]
+        
+        self.show_screen("high_scores", self.layout_high_scores,
+                         tuple(tuple(entry.values()) for entry in self.high_scores))
         
         # Wait for any key
         while self.get_input() == -1:
-            time.sleep(0.1)
+            self.sleep(0.1)
         
         return GameState.MENU
     
@@ -615,48 +2168,286 @@ class SnakeGame:
         
         return obstacles
     
-    def draw_border(self):
-        # Gambar border area bermain dengan warna yang berbeda
+    def validate_layout(self, obstacles, spawns):
+        """Perbaiki layout agar seluruh area kosong bisa dicapai dari spawn.
+
+        Sel spawn (dan sel di depan kepala) dikosongkan. Region yang terputus
+        dari region spawn pertama dibuka dengan membongkar satu sel dinding
+        jika dindingnya setebal satu sel; jika tidak bisa, region itu ditutup
+        menjadi rintangan, atau untuk spawn pemain lain dibuatkan jalur lurus.
+        Mengembalikan (obstacles, regions) dengan tepat satu region.
+        """
+        top, bottom = self.game_area_top, self.game_area_bottom
+        left, right = self.game_area_left, self.game_area_right
+        spawns = [(cell[0], cell[1]) for cell in spawns]
+        obstacles = set((obs[0], obs[1]) for obs in obstacles) - set(spawns)
+        
+        while True:
+            regions = LayoutRegions(top, bottom, left, right, obstacles)
+            home = regions.region_of(spawns[0])
+            pockets = [region_id for region_id in range(len(regions)) if region_id != home]
+            if not pockets:
+                return obstacles, regions
+            
+            carved = [self.pocket_wall(regions, region_id, home) for region_id in pockets]
+            carved = [wall for wall in carved if wall]
+            if carved:
+                obstacles.difference_update(carved)
+                self.emit("layout_repair", level=self.level, action="carve", cells=len(carved))
+                continue
+            
+            for region_id in pockets:
+                spawn = next((cell for cell in spawns if regions.region_of(cell) == region_id), None)
+                if spawn:
+                    # Spawn pemain lain terkurung: buka jalur lurus ke spawn pertama
+                    (y1, x1), (y2, x2) = spawns[0], spawn
+                    obstacles.difference_update((y1, x) for x in range(min(x1, x2), max(x1, x2) + 1))
+                    obstacles.difference_update((y, x2) for y in range(min(y1, y2), max(y1, y2) + 1))
+                else:
+                    obstacles.update(regions.cells[region_id])
+            self.emit("layout_repair", level=self.level, action="fill", cells=len(pockets))
+    
+    def pocket_wall(self, regions, region_id, home):
+        # Sel rintangan di dalam area yang bertetangga dengan kantong dan region spawn
+        for y, x in regions.cells[region_id]:
+            for dy, dx in DIRECTION_DELTAS.values():
+                wall = (y + dy, x + dx)
+                if (wall in regions.region or
+                        not (self.game_area_top < wall[0] < self.game_area_bottom and
+                             self.game_area_left < wall[1] < self.game_area_right)):
+                    continue
+                for ny, nx in DIRECTION_DELTAS.values():
+                    if regions.region.get((wall[0] + ny, wall[1] + nx)) == home:
+                        return wall
+        return None
+    
+    def border_cells(self):
+        # Sel border area bermain dengan warna yang berbeda per level
         border_color = Colors.CYAN if self.level < 3 else Colors.YELLOW if self.level < 5 else Colors.RED
+        cells = {}
         
         for i in range(self.game_area_left, self.game_area_right + 1):
-            self.draw_text(self.game_area_top, i, '═', border_color)
-            self.draw_text(self.game_area_bottom, i, '═', border_color)
+            cells[(self.game_area_top, i)] = ('═', border_color)
+            cells[(self.game_area_bottom, i)] = ('═', border_color)
         
         for i in range(self.game_area_top + 1, self.game_area_bottom):
-            self.draw_text(i, self.game_area_left, '║', border_color)
-            self.draw_text(i, self.game_area_right, '║', border_color)
-        
-        # Gambar sudut
-        self.draw_text(self.game_area_top, self.game_area_left, '╔', border_color)
-        self.draw_text(self.game_area_top, self.game_area_right, '╗', border_color)
-        self.draw_text(self.game_area_bottom, self.game_area_left, '╚', border_color)
-        self.draw_text(self.game_area_bottom, self.game_area_right, '╝', border_color)
+            cells[(i, self.game_area_left)] = ('║', border_color)
+            cells[(i, self.game_area_right)] = ('║', border_color)
+        
+        # Sudut
+        cells[(self.game_area_top, self.game_area_left)] = ('╔', border_color)
+        cells[(self.game_area_top, self.game_area_right)] = ('╗', border_color)
+        cells[(self.game_area_bottom, self.game_area_left)] = ('╚', border_color)
+        cells[(self.game_area_bottom, self.game_area_right)] = ('╝', border_color)
+        return cells
+    
+    def draw_border(self):
+        # Gambar border area bermain
+        self.draw_cells(self.border_cells())
     
-    def check_collision(self, head, snake, other_snake, obstacles):
+    def check_collision(self, head, snake, other_snake, obstacles, other_head=None):
         """Periksa semua jenis tabrakan dengan perbaikan"""
+        return self.collision_cause(head, snake, other_snake, obstacles, other_head) is not None
+    
+    def collision_cause(self, head, snake, other_snake, obstacles, other_head=None):
+        """Jenis tabrakan kepala ('wall', 'self', 'other', 'obstacle') atau None.
+        
+        other_head adalah kepala baru ular lain jika ia bergerak di tick yang
+        sama; masuk ke sel yang sama dengannya juga dihitung 'other'.
+        """
         # Tabrakan dengan border (diperbaiki)
         if (head[0] <= self.game_area_top or 
             head[0] >= self.game_area_bottom or 
             head[1] <= self.game_area_left or 
             head[1] >= self.game_area_right):
-            return True
+            return "wall"
         
         # Tabrakan dengan tubuh sendiri (diperbaiki)
         if head in snake[1:]:  # Skip kepala
-            return True
+            return "self"
         
         # Tabrakan dengan ular lain (multiplayer)
         if other_snake and head in other_snake:
-            return True
+            return "other"
+        
+        # Adu kepala: kedua ular masuk sel yang sama di tick yang sama
+        if other_head and head == other_head:
+            return "other"
         
-        # Tabrakan dengan rintangan (diperbaiki)
-        if head in obstacles:
-            return True
+        # Tabrakan dengan rintangan (set sel (y, x))
+        if (head[0], head[1]) in obstacles:
+            return "obstacle"
         
-        return False
+        return None
+    
+    def hamiltonian_cycle(self, obstacles):
+        # Siklus disimpan per layout sehingga restart tidak menghitung ulang.
+        # Rintangan acak HARD/EXPERT membuat kunci baru setiap restart, jadi
+        # hanya beberapa layout terakhir yang disimpan (LRU)
+        blocked = frozenset(tuple(obs) for obs in obstacles)
+        key = (self.game_area_top, self.game_area_bottom, self.game_area_left, self.game_area_right, blocked)
+        cycle = self.cycle_cache.pop(key, None)
+        if cycle is None:
+            cycle = HamiltonianCycle(self.game_area_top, self.game_area_left,
+                                     self.game_area_bottom - self.game_area_top - 1,
+                                     self.game_area_right - self.game_area_left - 1,
+                                     blocked)
+            if len(self.cycle_cache) >= 4:
+                del self.cycle_cache[next(iter(self.cycle_cache))]
+        self.cycle_cache[key] = cycle
+        return cycle
+    
+    def autopilot_move(self, snake, food, cycle):
+        """Arah berikutnya mengikuti siklus Hamilton dengan jalan pintas yang aman"""
+        n = len(cycle)
+        head = (snake[0][0], snake[0][1])
+        h = cycle.index[head]
+        target = cycle.cells[(h + 1) % n]
+        
+        # Jalan pintas hanya saat ular masih pendek. Melompat maju sejauh d
+        # aman selama tidak melewati ekor, karena urutan tubuh di siklus tetap
+        if len(snake) < n // 2 and food is not None:
+            tail_dist = (cycle.index[(snake[-1][0], snake[-1][1])] - h) % n
+            food_dist = (cycle.index[(food[0], food[1])] - h) % n
+            limit = min(food_dist, tail_dist - 4)
+            best = 1
+            for dy, dx in DIRECTION_DELTAS.values():
+                cell = (head[0] + dy, head[1] + dx)
+                j = cycle.index.get(cell)
+                if j is None:
+                    continue
+                d = (j - h) % n
+                if best < d <= limit:
+                    best, target = d, cell
+        
+        delta = (target[0] - head[0], target[1] - head[1])
+        for direction, direction_delta in DIRECTION_DELTAS.items():
+            if direction_delta == delta:
+                return direction
+        return Direction.RIGHT
+    
+    def generate_cycle_food(self, snake, cycle, foods=()):
+        # Makanan autopilot hanya diletakkan di sel yang dilalui siklus
+        for _ in range(100):
+            y, x = random.choice(cycle.cells)
+            if [y, x] not in snake and (y, x) not in foods:
+                return [y, x]
+        body = set((segment[0], segment[1]) for segment in snake)
+        free = [cell for cell in cycle.cells if cell not in body and cell not in foods]
+        if not free:
+            return None
+        y, x = random.choice(free)
+        return [y, x]
+    
+    def random_free_cell(self, is_free, attempts=20):
+        # Sel acak di dalam area bermain yang lolos pemeriksaan is_free
+        for _ in range(attempts):
+            if self.regions:
+                cell = self.regions.random_cell()
+            else:
+                cell = (random.randint(self.game_area_top + 1, self.game_area_bottom - 1),
+                        random.randint(self.game_area_left + 1, self.game_area_right - 1))
+            if is_free(cell):
+                return cell
+        return None
+    
+    def setup_entities(self, entities, occupied, hazards=True):
+        """Jadwalkan spawner bonus, power-up dan rintangan bergerak untuk level ini"""
+        def is_free(cell):
+            return entities.is_free(cell) and not occupied(cell)
+        
+        def spawn_bonus():
+            if len(entities.pickups) < 3 + self.level:
+                cell = self.random_free_cell(is_free)
+                if cell:
+                    entities.add_pickup(BonusFood(cell[0], cell[1], 5 * self.level), lifetime=60)
+        
+        def spawn_boost():
+            cell = self.random_free_cell(is_free)
+            if cell:
+                entities.add_pickup(SpeedBoost(cell[0], cell[1], factor=0.6, duration=50), lifetime=80)
+        
+        entities.every(40, spawn_bonus)
+        entities.every(150, spawn_boost)
+        
+        # Rintangan bergerak mulai level 3, lebih banyak pada difficulty tinggi
+        if hazards and self.level >= 3:
+            count = self.level - 2 + {"HARD": 1, "EXPERT": 2}.get(self.difficulty, 0)
+            for _ in range(count):
+                cell = self.random_free_cell(is_free, attempts=100)
+                if cell:
+                    period = random.randint(3, 8)
+                    entities.add_hazard(MovingObstacle(cell[0], cell[1], random.choice((-1, 1)), period), occupied)
+    
+    def start_recording(self, obstacles, entities):
+        """Buka file rekaman baru di record_dir untuk level ini"""
+        if not self.record_dir:
+            return None
+        os.makedirs(self.record_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.record_dir, f"snake-{stamp}-L{self.level}.snkrec")
+        suffix = 1
+        while os.path.exists(path):
+            suffix += 1
+            path = os.path.join(self.record_dir, f"snake-{stamp}-L{self.level}-{suffix}.snkrec")
+        
+        hazards = {(entity.y, entity.x) for entity in entities.hazards}
+        header = {
+            "rows": self.max_y,
+            "cols": self.max_x,
+            "level": self.level,
+            "difficulty": self.difficulty,
+            "speed": self.game_speed,
+            "multiplayer": self.is_multiplayer,
+            "obstacles": sorted(obstacles - hazards),
+            "obstacle": [self.obstacle_char, Colors.RED if self.level >= 4 else Colors.MAGENTA],
+            "items": [[self.food_char, Colors.YELLOW]] + [[kind.char, kind.color] for kind in MatchRecorder.KINDS[1:]],
+            "snakes": [[self.snake_char, Colors.GREEN, Colors.CYAN], [self.snake2_char, Colors.BLUE, Colors.MAGENTA]],
+        }
+        self.recorder = MatchRecorder(path, header)
+        return self.recorder
+    
+    def frame_items(self, foods, entities):
+        # {(y, x): jenis} dengan indeks MatchRecorder.KINDS; 0 adalah makanan biasa
+        items = {food: 0 for food in foods}
+        for y, x, entity in entities.cells():
+            items[(y, x)] = MatchRecorder.KINDS.index(type(entity))
+        return items
+    
+    def record_frame(self, tick, snakes, foods, entities, score, food_count, now):
+        self.recorder.frame(tick, snakes, self.frame_items(foods, entities), score, food_count, now)
+    
+    def start_bots(self, obstacles, entities, snakes, foods):
+        """Kirim keadaan awal level ke bot eksternal pemain yang sedang bermain"""
+        if not self.bots:
+            return None
+        players = [player for player in self.bots.bots if player == 1 or self.is_multiplayer]
+        if not players:
+            return None
+        hazards = {(entity.y, entity.x) for entity in entities.hazards}
+        state = {
+            "level": self.level,
+            "rows": self.max_y,
+            "cols": self.max_x,
+            "area": [self.game_area_top, self.game_area_left, self.game_area_bottom, self.game_area_right],
+            "walls": sorted(obstacles - hazards),
+        }
+        self.bots.start(players, state, snakes, self.frame_items(foods, entities))
+        return self.bots
+    
+    def stop_recording(self, result):
+        if self.recorder:
+            self.recorder.close(result)
+            self.recorder = None
     
     def game_loop(self):
+        autopilot = self.autopilot and not self.is_multiplayer
+        
+        # Level baru memakai ukuran terminal terkini; resize di tengah level
+        # hanya memusatkan ulang kanvas (lihat handle_resize)
+        self.current_screen = None
+        self.set_screen_size(*self.term_size)
+        
         # Inisialisasi ular 1
         start_y = (self.game_area_top + self.game_area_bottom) // 2
         start_x1 = self.game_area_left + (self.game_area_right - self.game_area_left) // 4
@@ -679,15 +2470,92 @@ class SnakeGame:
                 [start_y, start_x2 + 2]
             ]
         
-        # Generate makanan dan rintangan
-        obstacles = self.generate_obstacles(self.level)
-        food = self.generate_food(snake1 + snake2, obstacles)
+        # Generate rintangan lalu pastikan spawn kosong dan semua area terjangkau
+        spawns = snake1 + [[start_y, start_x1 + i] for i in range(1, 4)]
+        if self.is_multiplayer:
+            spawns += snake2 + [[start_y, start_x2 - i] for i in range(1, 4)]
+        obstacles, self.regions = self.validate_layout(self.generate_obstacles(self.level), spawns)
+        cycle = None
+        if autopilot:
+            # Autopilot memulai ular di atas siklus Hamilton
+            cycle = self.hamiltonian_cycle(obstacles)
+            if len(cycle) < 4:
+                return GameState.GAME_OVER
+            snake1 = [list(cycle.cells[2 - i]) for i in range(3)]
+        
+        def refill_food():
+            # Isi ulang sampai jumlah makanan yang dikonfigurasi
+            while len(foods) < self.food_items:
+                if autopilot:
+                    food = self.generate_cycle_food(snake1, cycle, foods)
+                else:
+                    food = self.generate_food(snake1 + snake2, obstacles, foods)
+                if food is None or food in foods:
+                    break
+                foods.add(food)
+        
+        foods = self.foods = FoodIndex(self.max_y, self.max_x)
+        refill_food()
+        autopilot_food = None
         
         score = 0
         food_count = 0
         required_food = 3 + self.level
+        tick = 0
         
         paused = False
+        self.emit("level_start", level=self.level, difficulty=self.difficulty,
+                  multiplayer=self.is_multiplayer, rows=self.max_y, cols=self.max_x)
+        
+        # Border dan rintangan tidak berubah selama level, jadi selnya
+        # disiapkan sekali dan disalin di setiap frame
+        static_cells = self.border_cells()
+        obstacle_color = Colors.RED if self.level >= 4 else Colors.MAGENTA
+        for obs in obstacles:
+            if (self.game_area_top < obs[0] < self.game_area_bottom and 
+                self.game_area_left < obs[1] < self.game_area_right):
+                static_cells[(obs[0], obs[1])] = (self.obstacle_char, obstacle_color)
+        
+        # Entitas berwaktu (bonus, power-up, rintangan bergerak)
+        def occupied(cell):
+            target = [cell[0], cell[1]]
+            return cell in foods or target in snake1 or target in snake2
+        
+        entities = EntityManager(obstacles)
+        self.setup_entities(entities, occupied, hazards=not autopilot)
+        
+        # Setiap ular bergerak dengan periodenya sendiri (kecepatan pemain dan
+        # power-up), sedangkan timer entitas tetap berdetak sesuai game_speed
+        base_period = round(self.game_speed * 1000000)
+        boosts = {}
+        boost_timers = {}
+        
+        def move_period(player):
+            return round(base_period * boosts.get(player, 1.0) / self.snake_speeds[player - 1])
+        
+        scheduler = MoveScheduler()
+        scheduler.add(MoveScheduler.WORLD, base_period)
+        for player in ((1, 2) if self.is_multiplayer else (1,)):
+            scheduler.add(player, move_period(player))
+        
+        def end_boost(player):
+            boosts.pop(player, None)
+            boost_timers.pop(player, None)
+            scheduler.set_period(player, move_period(player))
+        
+        recorder = self.start_recording(obstacles, entities)
+        if recorder:
+            self.record_frame(tick, [snake1, snake2] if self.is_multiplayer else [snake1],
+                              foods, entities, score, food_count, scheduler.now)
+        bots = self.start_bots(obstacles, entities, [snake1, snake2] if self.is_multiplayer else [snake1], foods)
+        bot_players = {bot.player for bot in bots.active} if bots else set()
+        bot_moves = {}
+        dropped_bots = set()
+        
+        # Jadwal gerak di waktu nyata; gerak pertama satu periode setelah mulai
+        tick_start = time.perf_counter()
+        delay = scheduler.next_delay() / 1000000
+        next_move = tick_start + delay
         
         while True:
             if HAS_CURSES:
@@ -695,34 +2563,35 @@ class SnakeGame:
             else:
                 self.clear_screen()
             
-            self.draw_border()
-            
-            # Gambar rintangan dengan warna berdasarkan level
-            obstacle_color = Colors.RED if self.level >= 4 else Colors.MAGENTA
-            for obs in obstacles:
-                if (self.game_area_top < obs[0] < self.game_area_bottom and 
-                    self.game_area_left < obs[1] < self.game_area_right):
-                    self.draw_text(obs[0], obs[1], self.obstacle_char, obstacle_color)
+            cells = dict(static_cells)
             
-            # Gambar makanan dengan efek berkedip
+            # Makanan dengan efek berkedip
             if not paused:
                 food_color = Colors.YELLOW if int(time.time() * 5) % 2 == 0 else Colors.MAGENTA
-                self.draw_text(food[0], food[1], self.food_char, food_color)
+                for food in foods:
+                    cells[food] = (self.food_char, food_color)
             
-            # Gambar ular 1
-            for i, segment in enumerate(snake1):
+            for y, x, entity in entities.cells():
+                cells[(y, x)] = (entity.char, entity.color)
+            
+            # Ular 1 (digambar dari ekor agar kepala selalu di atas)
+            for i in range(len(snake1) - 1, -1, -1):
+                segment = snake1[i]
                 if (self.game_area_top < segment[0] < self.game_area_bottom and 
                     self.game_area_left < segment[1] < self.game_area_right):
                     color = Colors.GREEN if i == 0 else Colors.CYAN
-                    self.draw_text(segment[0], segment[1], self.snake_char, color)
+                    cells[(segment[0], segment[1])] = (self.snake_char, color)
             
-            # Gambar ular 2 untuk multiplayer
+            # Ular 2 untuk multiplayer
             if self.is_multiplayer:
-                for i, segment in enumerate(snake2):
+                for i in range(len(snake2) - 1, -1, -1):
+                    segment = snake2[i]
                     if (self.game_area_top < segment[0] < self.game_area_bottom and 
                         self.game_area_left < segment[1] < self.game_area_right):
                         color = Colors.BLUE if i == 0 else Colors.MAGENTA
-                        self.draw_text(segment[0], segment[1], self.snake2_char, color)
+                        cells[(segment[0], segment[1])] = (self.snake2_char, color)
+            
+            self.draw_cells(cells)
             
             # Gambar UI informatif
             ui_elements = []
@@ -759,17 +2628,58 @@ class SnakeGame:
             
             self.refresh_screen()
             
-            # Handle input
-            key = self.get_input()
+            # Gerak dan gambar frame ini melewati jadwal gerak berikutnya
+            now = time.perf_counter()
+            if now > next_move:
+                if not paused:
+                    self.emit("overrun", tick=tick, elapsed_ms=round((now - tick_start) * 1000, 3),
+                              budget_ms=round(delay * 1000, 3))
+                next_move = now
+            
+            # Bot eksternal menerima delta tick ini dan menjawab sebelum gerak
+            # berikutnya (atau sebelum deadline bot jika lebih awal)
+            if bots and not paused:
+                bots.send_tick(tick, [snake1, snake2] if self.is_multiplayer else [snake1],
+                               self.frame_items(foods, entities))
+                bot_moves = bots.collect(min(next_move, now + bots.timeout))
+                # Bot yang sudah keluar dicatat sekali saja, bukan di setiap tick
+                for player in sorted(bot_players - bot_moves.keys() - dropped_bots):
+                    if not bots.bots[player].alive:
+                        dropped_bots.add(player)
+                    self.emit("bot_timeout", player=player, tick=tick, dropped=player in dropped_bots)
+            
+            # Handle input: tunggu tombol sampai gerak berikutnya jatuh tempo.
+            # Tombol yang datang lebih awal tidak mempercepat ular; sisa waktu
+            # tetap ditunggu lalu hasil gerak langsung digambar di iterasi berikutnya
+            if paused:
+                key = self.get_input()
+            else:
+                key = self.get_input(max(0, round((next_move - time.perf_counter()) * 1000)))
+                remaining = next_move - time.perf_counter()
+                if remaining > 0:
+                    self.sleep(remaining)
             
             # Tombol pause
             if key == ord('p') or key == ord('P'):
                 paused = not paused
+                if not paused:
+                    # Selama pause get_input memblok, jadi jadwal lama sudah lewat:
+                    # gerak berikutnya dijadwalkan ulang dari sekarang dan frame
+                    # digambar dulu tanpa gerak atau pemeriksaan overrun
+                    tick_start = time.perf_counter()
+                    next_move = tick_start + delay
+                    continue
             
             if paused:
-                time.sleep(0.1)
                 continue
             
+            tick_start = time.perf_counter()
+            
+            # Semua ular yang jatuh tempo pada instan yang sama bergerak bersamaan
+            due = scheduler.pop_due()
+            move1 = 1 in due
+            move2 = 2 in due
+            
             # Handle kontrol ular 1 (WASD)
             if key == ord('w') and direction1 != Direction.DOWN:
                 direction1 = Direction.UP
@@ -795,20 +2705,44 @@ class SnakeGame:
                     if direction2 != Direction.LEFT:
                         direction2 = Direction.RIGHT
             
+            if autopilot and move1:
+                # Target dipertahankan sampai dimakan. Makanan terdekat berganti
+                # saat ular bergerak, dan jalan pintas ke target yang berganti
+                # bisa terus melompati semua makanan tanpa pernah memakannya
+                if autopilot_food is None or autopilot_food not in foods:
+                    autopilot_food = foods.nearest(*snake1[0])
+                direction1 = self.autopilot_move(snake1, autopilot_food, cycle)
+            
+            # Lawan komputer untuk pemain 2, dibatasi separuh periode gerak ular 2
+            # (bisa lebih pendek dari tick dunia karena --speed2 atau power-up)
+            if move2 and self.ai_player2 and 2 not in bot_players:
+                budget = max(0.01, min(0.05, move_period(2) / 2000000))
+                direction2 = self.ai.choose(self, snake2, snake1, obstacles, foods, budget) or direction2
+            
+            # Arah dari bot eksternal; langkah balik diabaikan seperti tombol
+            move = bot_moves.get(1)
+            if move and move != OPPOSITE[direction1]:
+                direction1 = move
+            move = bot_moves.get(2)
+            if move and move != OPPOSITE[direction2]:
+                direction2 = move
+            
             # Gerakkan ular 1
-            head1 = snake1[0].copy()
-            if direction1 == Direction.UP:
-                head1[0] -= 1
-            elif direction1 == Direction.DOWN:
-                head1[0] += 1
-            elif direction1 == Direction.LEFT:
-                head1[1] -= 1
-            elif direction1 == Direction.RIGHT:
-                head1[1] += 1
+            head1 = []
+            if move1:
+                head1 = snake1[0].copy()
+                if direction1 == Direction.UP:
+                    head1[0] -= 1
+                elif direction1 == Direction.DOWN:
+                    head1[0] += 1
+                elif direction1 == Direction.LEFT:
+                    head1[1] -= 1
+                elif direction1 == Direction.RIGHT:
+                    head1[1] += 1
             
             # Gerakkan ular 2 untuk multiplayer
             head2 = []
-            if self.is_multiplayer:
+            if move2:
                 head2 = snake2[0].copy()
                 if direction2 == Direction.UP:
                     head2[0] -= 1
@@ -819,27 +2753,45 @@ class SnakeGame:
                 elif direction2 == Direction.RIGHT:
                     head2[1] += 1
             
-            # Periksa tabrakan untuk ular 1
-            if self.check_collision(head1, snake1, snake2 if self.is_multiplayer else [], obstacles):
+            tick += 1
+            if MoveScheduler.WORLD in due:
+                entities.tick()
+            if move1:
+                self.emit("move", tick=tick, player=1, y=head1[0], x=head1[1])
+            if move2:
+                self.emit("move", tick=tick, player=2, y=head2[0], x=head2[1])
+            
+            # Periksa tabrakan untuk ular 1 (terhadap tubuh sebelum bergerak)
+            cause = self.collision_cause(head1, snake1, snake2 if self.is_multiplayer else [], obstacles, head2) if move1 else None
+            if cause:
+                self.emit("death", player=1, cause=cause, tick=tick, head=head1)
+                self.emit("level_end", level=self.level, result="game_over", score=score, food=food_count, ticks=tick)
                 self.score = score
                 if score > self.high_score:
                     self.high_score = score
                 return GameState.GAME_OVER
             
             # Periksa tabrakan untuk ular 2
-            if self.is_multiplayer and self.check_collision(head2, snake2, snake1, obstacles):
+            cause = self.collision_cause(head2, snake2, snake1, obstacles, head1) if move2 else None
+            if cause:
+                self.emit("death", player=2, cause=cause, tick=tick, head=head2)
+                self.emit("level_end", level=self.level, result="game_over", score=score, food=food_count, ticks=tick)
                 self.score = score
                 if score > self.high_score:
                     self.high_score = score
                 return GameState.GAME_OVER
             
             # Periksa tabrakan makanan untuk ular 1
-            if head1 == food:
+            if not move1:
+                pass
+            elif head1 in foods:
                 score += 10 * self.level
                 food_count += 1
-                food = self.generate_food(snake1 + (snake2 if self.is_multiplayer else []), obstacles)
+                self.emit("food", player=1, tick=tick, score=score)
+                foods.remove(head1)
                 # Ular tumbuh
                 snake1.insert(0, head1)
+                refill_food()
             else:
                 # Gerakkan ular normal
                 snake1.insert(0, head1)
@@ -847,54 +2799,97 @@ class SnakeGame:
                     snake1.pop()
             
             # Periksa tabrakan makanan untuk ular 2
-            if self.is_multiplayer:
-                if head2 == food:
+            if move2:
+                if head2 in foods:
                     score += 10 * self.level
                     food_count += 1
-                    food = self.generate_food(snake1 + snake2, obstacles)
+                    self.emit("food", player=2, tick=tick, score=score)
+                    foods.remove(head2)
                     # Ular tumbuh
                     snake2.insert(0, head2)
+                    refill_food()
                 else:
                     # Gerakkan ular normal
                     snake2.insert(0, head2)
                     if len(snake2) > 3:  # Pertahankan panjang minimum
                         snake2.pop()
-            else:
+            elif not self.is_multiplayer:
                 # Untuk single player, pastikan snake2 kosong
                 snake2 = []
             
+            # Ambil pickup berwaktu
+            for player, head in ((1, head1), (2, head2)):
+                entity = entities.take_pickup(head) if head else None
+                if isinstance(entity, BonusFood):
+                    score += entity.points
+                    self.emit("bonus", player=player, tick=tick, score=score)
+                elif isinstance(entity, SpeedBoost):
+                    # Power-up hanya mempercepat ular yang mengambilnya
+                    boosts[player] = entity.factor
+                    if player in boost_timers:
+                        entities.wheel.cancel(boost_timers[player])
+                    boost_timers[player] = entities.schedule(entity.duration, lambda player=player: end_boost(player))
+                    scheduler.set_period(player, move_period(player))
+                    self.emit("boost", player=player, tick=tick)
+            
+            if recorder:
+                self.record_frame(tick, [snake1, snake2] if self.is_multiplayer else [snake1],
+                                  foods, entities, score, food_count, scheduler.now)
+            
+            # Autopilot terus tumbuh sampai seluruh siklus terisi. Papan baru
+            # benar-benar penuh jika siklus mencakup semua sel bebas
+            if autopilot:
+                if not foods:
+                    result = GameState.CYCLE_FULL if cycle.uncovered else GameState.BOARD_FULL
+                    self.emit("level_end", level=self.level, result=result.name.lower(), score=score,
+                              food=food_count, ticks=tick, uncovered=cycle.uncovered)
+                    self.score = score
+                    self.cycle_uncovered = cycle.uncovered
+                    if score > self.high_score:
+                        self.high_score = score
+                    return result
+            
             # Periksa penyelesaian level
-            if food_count >= required_food:
+            elif food_count >= required_food:
+                self.emit("level_end", level=self.level, result="complete", score=score, food=food_count, ticks=tick)
                 self.score = score
                 if score > self.high_score:
                     self.high_score = score
                 return GameState.LEVEL_COMPLETE
             
             # Keluar dari game atau kembali ke menu
-            if key == ord('q') or key == ord('Q'):
-                return GameState.MENU
-            elif key == ord('m') or key == ord('M'):
+            if key in (ord('q'), ord('Q'), ord('m'), ord('M')):
+                self.emit("level_end", level=self.level, result="quit", score=score, food=food_count, ticks=tick)
                 return GameState.MENU
             
-            # Kecepatan game berdasarkan difficulty
-            time.sleep(self.game_speed)
+            # Event gerak berikutnya (kecepatan ular dan power-up) dijadwalkan dari
+            # jadwal sebelumnya agar waktu tunggu input tidak menggeser tempo
+            delay = scheduler.next_delay() / 1000000
+            next_move += delay
     
-    def generate_food(self, snake, obstacles):
+    def generate_food(self, snake, obstacles, foods=()):
         max_attempts = 100
         for _ in range(max_attempts):
-            food = [
-                random.randint(self.game_area_top + 1, self.game_area_bottom - 1), 
-                random.randint(self.game_area_left + 1, self.game_area_right - 1)
-            ]
-            if food not in snake and food not in obstacles:
+            if self.regions:
+                # Hanya sel yang terjangkau dari layout yang sudah divalidasi
+                food = list(self.regions.random_cell())
+            else:
+                food = [
+                    random.randint(self.game_area_top + 1, self.game_area_bottom - 1), 
+                    random.randint(self.game_area_left + 1, self.game_area_right - 1)
+                ]
+            if food not in snake and (food[0], food[1]) not in obstacles and food not in foods:
                 return food
         # Fallback position
+        if self.regions:
+            for cell in self.regions.cells[0]:
+                food = list(cell)
+                if food not in snake and cell not in obstacles and food not in foods:
+                    return food
         return [(self.game_area_top + self.game_area_bottom) // 2, 
                 (self.game_area_left + self.game_area_right) // 2]
     
-    def show_game_over(self):
-        self.clear_screen()
-        
+    def layout_game_over(self):
         # Game Over yang responsif
         if self.max_x >= 50:
             game_over_art = [
@@ -936,8 +2931,10 @@ class SnakeGame:
         
         continue_text = "Press 'R' to Restart, 'M' for Menu, or 'Q' to Quit"
         self.draw_text(details_y + 8, 0, continue_text, Colors.CYAN, centered=True)
-        
-        self.refresh_screen()
+    
+    def show_game_over(self):
+        self.show_screen("game_over", self.layout_game_over,
+                         self.score, self.level, self.high_score, self.is_multiplayer)
         
         while True:
             key = self.get_input()
@@ -949,9 +2946,7 @@ class SnakeGame:
             elif key == ord('q') or key == ord('Q'):
                 sys.exit(0)
     
-    def show_level_complete(self):
-        self.clear_screen()
-        
+    def layout_level_complete(self):
         # Level Complete yang responsif
         if self.max_x >= 50:
             complete_art = [
@@ -992,8 +2987,9 @@ class SnakeGame:
         
         options_text = "Press 'N' for Next Level, 'M' for Menu, or 'Q' to Quit"
         self.draw_text(details_y + 7, 0, options_text, Colors.CYAN, centered=True)
-        
-        self.refresh_screen()
+    
+    def show_level_complete(self):
+        self.show_screen("level_complete", self.layout_level_complete, self.score, self.level, self.high_score)
         
         while True:
             key = self.get_input()
@@ -1005,11 +3001,199 @@ class SnakeGame:
             elif key == ord('q') or key == ord('Q'):
                 sys.exit(0)
     
+    def layout_board_full(self):
+        if self.cycle_uncovered:
+            board_full_art = [
+                "╔══════════════════════════════╗",
+                "║        CYCLE FILLED!         ║",
+                "║  The snake filled its cycle  ║",
+                "╚══════════════════════════════╝",
+            ]
+        else:
+            board_full_art = [
+                "╔══════════════════════════════╗",
+                "║         BOARD FULL!          ║",
+                "║   The snake filled the map   ║",
+                "╚══════════════════════════════╝",
+            ]
+        
+        for i, line in enumerate(board_full_art):
+            self.draw_text(5 + i, 0, line, Colors.GREEN, centered=True)
+        
+        details_y = 10
+        details_width = min(40, self.max_x - 4)
+        details_x = max(0, self.max_x // 2 - details_width // 2)
+        
+        self.draw_box(details_y, details_x, 6, details_width, Colors.GREEN)
+        
+        self.draw_text(details_y + 1, 0, f"Level {self.level} Cleared", Colors.YELLOW, centered=True)
+        self.draw_text(details_y + 2, 0, f"Score: {self.score}", Colors.GREEN, centered=True)
+        self.draw_text(details_y + 3, 0, f"High Score: {self.high_score}", Colors.MAGENTA, centered=True)
+        if self.cycle_uncovered:
+            self.draw_text(details_y + 4, 0, f"Cells off the cycle: {self.cycle_uncovered}", Colors.RED, centered=True)
+        
+        options_text = "Press 'R' to Restart, 'M' for Menu, or 'Q' to Quit"
+        self.draw_text(details_y + 7, 0, options_text, Colors.CYAN, centered=True)
+    
+    def show_board_full(self):
+        self.show_screen("board_full", self.layout_board_full, self.score, self.level, self.high_score,
+                         self.cycle_uncovered)
+        
+        while True:
+            key = self.get_input()
+            if key == ord('r') or key == ord('R'):
+                return GameState.PLAYING
+            elif key == ord('m') or key == ord('M'):
+                return GameState.MENU
+            elif key == ord('q') or key == ord('Q'):
+                sys.exit(0)
+    
+    def show_replay(self):
+        """Putar file rekaman: play/pause, fast-forward, step dan seek ke tick mana pun"""
+        try:
+            replay = MatchReplay(self.replay_path)
+        except (OSError, ValueError, KeyError, struct.error, zlib.error) as e:
+            self.clear_screen()
+            self.draw_text(self.max_y // 2, 0, f"Cannot open replay: {e}", Colors.RED, centered=True)
+            self.draw_text(self.max_y // 2 + 2, 0, "Press any key to return to menu", Colors.CYAN, centered=True)
+            self.refresh_screen()
+            while self.get_input() == -1:
+                pass
+            return GameState.MENU
+        
+        header = replay.header
+        self.current_screen = None
+        screen_size = (self.max_y, self.max_x)
+        level = self.level
+        # Gunakan ukuran dan level rekaman agar border sama dengan saat bermain
+        self.level = header["level"]
+        self.set_screen_size(header["rows"], header["cols"])
+        static_cells = self.border_cells()
+        obstacle_char, obstacle_color = header["obstacle"]
+        for y, x in header["obstacles"]:
+            if (self.game_area_top < y < self.game_area_bottom and
+                self.game_area_left < x < self.game_area_right):
+                static_cells[(y, x)] = (obstacle_char, obstacle_color)
+        
+        speeds = (1, 2, 4, 8, 16, 64)
+        speed = 0
+        playing = True
+        goto = None
+        redraw = True
+        name = os.path.basename(self.replay_path)
+        # Jam putar dalam mikrodetik waktu scheduler rekaman; tick diputar
+        # saat jam melewati waktunya, jadi jarak antar tick sama seperti saat bermain
+        clock, last = replay.time, time.perf_counter()
+        try:
+            while True:
+                # Saat pause layar hanya digambar ulang jika ada perubahan
+                if redraw:
+                    if HAS_CURSES:
+                        self.screen.clear()
+                    else:
+                        self.clear_screen()
+                
+                    cells = dict(static_cells)
+                    for cell, kind in replay.items.items():
+                        cells[cell] = tuple(header["items"][kind])
+                    for snake, (char, head_color, body_color) in zip(replay.snakes, header["snakes"]):
+                        for segment in snake:
+                            cells[segment] = (char, body_color)
+                        if snake:
+                            cells[snake[0]] = (char, head_color)
+                    self.draw_cells(cells)
+                
+                    status = "▶" if playing else "⏸"
+                    if replay.tick >= replay.end_tick and replay.result:
+                        status = f"END ({replay.result})"
+                    self.draw_text(1, 0, f"Replay: {name} | Tick {replay.tick}/{replay.end_tick}", Colors.YELLOW, centered=True)
+                    self.draw_text(2, 0, f"{status} x{speeds[speed]} | Level {header['level']} | Score: {replay.score} | Food: {replay.food_count}",
+                                   Colors.YELLOW, centered=True)
+                    if goto is not None:
+                        controls = f"Go to tick: {goto}_  (Enter: jump, Esc: cancel)"
+                    elif self.max_x >= 70:
+                        controls = "Space: Play | F: Speed | ,/.: Step | [/]: Seek | 0-9: Jump | G: Tick | Q: Back"
+                    else:
+                        controls = "Spc F , . [ ] 0-9 G Q"
+                    self.draw_text(self.max_y - 2, 0, controls, Colors.CYAN, centered=True)
+                    self.refresh_screen()
+                
+                self.resized = False
+                wait = 100
+                upcoming = replay.next_time()
+                if playing and upcoming is not None:
+                    wait = int(max(0, upcoming - clock) / speeds[speed] / 1000) + 1
+                key = self.get_input(wait)
+                redraw = playing or key != -1 or self.resized
+                
+                # Mode input nomor tick
+                if goto is not None:
+                    if ord('0') <= key <= ord('9'):
+                        goto += chr(key)
+                    elif key in (curses.KEY_BACKSPACE if HAS_CURSES else 8, 8, 127):
+                        goto = goto[:-1]
+                    elif key in (10, 13):
+                        if goto:
+                            replay.seek(int(goto))
+                        goto = None
+                    elif key == 27:
+                        goto = None
+                    continue
+                
+                if key in (ord('q'), ord('Q'), ord('m'), ord('M')):
+                    return GameState.MENU
+                elif key in (ord(' '), ord('p'), ord('P')):
+                    playing = not playing
+                    if playing and replay.tick >= replay.end_tick:
+                        replay.seek(0)
+                elif key in (ord('f'), ord('F')):
+                    speed = (speed + 1) % len(speeds)
+                elif key in (ord('.'), curses.KEY_RIGHT if HAS_CURSES else 77):
+                    playing = False
+                    replay.step()
+                elif key in (ord(','), curses.KEY_LEFT if HAS_CURSES else 75):
+                    playing = False
+                    replay.seek(replay.tick - 1)
+                elif key == ord(']'):
+                    replay.seek(replay.tick + max(1, replay.end_tick // 10))
+                elif key == ord('['):
+                    replay.seek(replay.tick - max(1, replay.end_tick // 10))
+                elif ord('0') <= key <= ord('9'):
+                    replay.seek(replay.end_tick * (key - ord('0')) // 10)
+                elif key in (ord('g'), ord('G')):
+                    playing = False
+                    goto = ""
+                elif playing:
+                    now = time.perf_counter()
+                    clock += (now - last) * 1000000 * speeds[speed]
+                    last = now
+                    while upcoming is not None and upcoming <= clock:
+                        replay.step()
+                        upcoming = replay.next_time()
+                    if upcoming is None:
+                        playing = False
+                    continue
+                # Setelah pause, step atau seek jam mulai lagi dari tick sekarang
+                clock, last = replay.time, time.perf_counter()
+        finally:
+            self.level = level
+            self.set_screen_size(*screen_size)
+    
+    def handle_error(self, error):
+        # Dipanggil run() di dalam blok except; harness bisa mencatat traceback-nya
+        print(f"\nAn error occurred: {error}")
+    
     def run(self):
         try:
             self.init_screen()
             
+            previous_state = None
             while True:
+                if self.game_state != previous_state:
+                    self.emit("state", prev=previous_state.name if previous_state else None,
+                              state=self.game_state.name)
+                    previous_state = self.game_state
+                
                 if self.game_state == GameState.MENU:
                     self.game_state = self.show_menu()
                     self.score = 0
@@ -1019,11 +3203,16 @@ class SnakeGame:
                 
                 elif self.game_state == GameState.PLAYING:
                     result = self.game_loop()
+                    self.stop_recording(result.name.lower())
+                    if self.bots:
+                        self.bots.end(result.name.lower())
                     
                     if result == GameState.GAME_OVER:
                         self.game_state = GameState.GAME_OVER
                     elif result == GameState.LEVEL_COMPLETE:
                         self.game_state = self.show_level_complete()
+                    elif result in (GameState.BOARD_FULL, GameState.CYCLE_FULL):
+                        self.game_state = self.show_board_full()
                     elif result == GameState.MENU:
                         self.game_state = GameState.MENU
                 
@@ -1036,18 +3225,715 @@ class SnakeGame:
                 elif self.game_state == GameState.HIGH_SCORES:
                     self.game_state = self.show_high_scores()
                 
+                elif self.game_state == GameState.REPLAY:
+                    self.game_state = self.show_replay()
+                
         except KeyboardInterrupt:
             print("\nGame interrupted! Thanks for playing! 🐍")
         except Exception as e:
-            print(f"\nAn error occurred: {e}")
+            self.handle_error(e)
         finally:
             self.cleanup_screen()
+            self.stop_recording("interrupted")
+            if self.telemetry:
+                self.telemetry.close()
+            if self.asciicast:
+                self.asciicast.close()
+            if self.bots:
+                self.bots.close()
+
+class VirtualScreen:
+    """Pengganti window curses yang menggambar ke grid di memori.
+
+    Setiap sel menyimpan codepoint karakter dan kode warna Colors. refresh()
+    meneruskan grid ke on_refresh, dan getch() membaca tombol dari antrean.
+    """
+    
+    def __init__(self, rows, cols, keys=None, on_refresh=None):
+        self.rows, self.cols = rows, cols
+        self.keys = keys
+        self.on_refresh = on_refresh
+        self.delay = -1
+        self.blank = array("I", [ord(" ")]) * (rows * cols)
+        self.chars = array("I", self.blank)
+        self.colors = bytearray(rows * cols)
+    
+    def getmaxyx(self):
+        return self.rows, self.cols
+    
+    def keypad(self, flag):
+        pass
+    
+    def nodelay(self, flag):
+        self.delay = 0 if flag else -1
+    
+    def timeout(self, delay):
+        self.delay = delay
+    
+    def clear(self):
+        self.chars[:] = self.blank
+        self.colors[:] = bytes(len(self.colors))
+    
+    def addstr(self, y, x, text, attr=0):
+        if not (0 <= y < self.rows and 0 <= x < self.cols):
+            return
+        codes = self.cell_codes(text)[:self.cols - x]
+        start = y * self.cols + x
+        self.chars[start:start + len(codes)] = codes
+        self.colors[start:start + len(codes)] = bytes([attr]) * len(codes)
+    
+    # Hasil cell_codes untuk teks non-ASCII (border, emoji menu) yang berulang setiap frame
+    wide_codes = {}
+    
+    @staticmethod
+    def cell_codes(text):
+        # Karakter lebar (emoji, CJK) memakai dua sel seperti di terminal:
+        # sel kedua diisi 0. Karakter tanpa lebar (variation selector) dibuang.
+        if text.isascii():
+            return array("I", map(ord, text))
+        codes = VirtualScreen.wide_codes.get(text)
+        if codes is not None:
+            return codes
+        codes = array("I")
+        for char in text:
+            if unicodedata.combining(char) or unicodedata.category(char) in ("Mn", "Me", "Cf"):
+                continue
+            codes.append(ord(char))
+            if unicodedata.east_asian_width(char) in ("W", "F"):
+                codes.append(0)
+        if len(VirtualScreen.wide_codes) >= 4096:
+            VirtualScreen.wide_codes.clear()
+        VirtualScreen.wide_codes[text] = codes
+        return codes
+    
+    def refresh(self):
+        if self.on_refresh:
+            self.on_refresh(self.chars, self.colors)
+    
+    def snapshot(self):
+        return array("I", self.chars), bytearray(self.colors)
+    
+    def diff(self, previous):
+        """Output ANSI yang mengubah snapshot() lama menjadi isi layar saat ini.
+        
+        previous None berarti terminal masih kosong. Hanya rentang sel yang
+        berubah di setiap baris yang ditulis.
+        """
+        cols = self.cols
+        chars, colors = self.chars, self.colors
+        out = []
+        if previous is None:
+            # Frame pertama dibandingkan dengan layar kosong
+            out.append("\033[?25l\033[2J")
+            previous = (self.blank, bytes(len(colors)))
+        old_chars, old_colors = previous
+        
+        for y in range(self.rows):
+            start, end = y * cols, (y + 1) * cols
+            row_chars, row_colors = chars[start:end], colors[start:end]
+            before_chars, before_colors = old_chars[start:end], old_colors[start:end]
+            if row_chars == before_chars and row_colors == before_colors:
+                continue
+            changed = [x for x in range(cols)
+                       if row_chars[x] != before_chars[x] or row_colors[x] != before_colors[x]]
+            first, last = changed[0], changed[-1]
+            # Mulai dari sel utama jika perubahan jatuh di paruh kanan karakter lebar
+            if first > 0 and row_chars[first] == 0:
+                first -= 1
+            out.append(f"\033[{y + 1};{first + 1}H")
+            color = None
+            for x in range(first, last + 1):
+                code = row_chars[x]
+                if not code:
+                    continue
+                if row_colors[x] != color:
+                    color = row_colors[x]
+                    out.append(ANSI_RESET + ANSI_COLORS.get(color, ""))
+                out.append(chr(code))
+        
+        if out:
+            out.append(ANSI_RESET)
+        return "".join(out)
+    
+    def getch(self):
+        if self.keys is None:
+            return -1
+        try:
+            if self.delay < 0:
+                return self.keys.get()
+            if self.delay == 0:
+                return self.keys.get_nowait()
+            return self.keys.get(timeout=self.delay / 1000)
+        except queue.Empty:
+            return -1
+
+class HeadlessGame(SnakeGame):
+    """SnakeGame yang menggambar ke VirtualScreen, bukan ke terminal"""
+    
+    def __init__(self, screen):
+        super().__init__()
+        self.virtual_screen = screen
+    
+    def init_screen(self):
+        self.screen = self.virtual_screen
+        self.term_size = self.screen.getmaxyx()
+        self.set_screen_size(*self.term_size)
+    
+    def cleanup_screen(self):
+        pass
+    
+    def clear_screen(self):
+        self.screen.clear()
+    
+    # Selalu gambar ke VirtualScreen, juga saat curses tidak tersedia
+    def write_text(self, y, x, text, color_code):
+        self.screen.addstr(y, x, text, color_code)
+    
+    def refresh_screen(self):
+        if self.asciicast:
+            self.asciicast.frame(max(self.term_size[0], self.max_y), max(self.term_size[1], self.max_x))
+        self.screen.refresh()
+    
+    def color_attr(self, color_code):
+        # Kode warna disimpan apa adanya; renderer yang memetakan ke curses
+        return color_code
+
+class Asciicast:
+    """Rekaman sesi terminal sebagai file asciicast v2 (asciinema).
+
+    draw_text() dan refresh_screen() hanya menambah operasi gambar ke daftar
+    dan menyerahkan frame ke deque, sehingga game loop tidak menunggu apa pun.
+    Thread penulis menyusun setiap frame di VirtualScreen, membandingkannya
+    dengan frame sebelumnya dan hanya menulis rentang baris yang berubah.
+    Setiap layar menggambar ulang seluruh isinya sebelum refresh, jadi frame
+    yang dibuang saat buffer penuh tidak merusak diff berikutnya.
+    """
+    
+    def __init__(self, path, capacity=256, flush_interval=0.1):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.frames = deque(maxlen=capacity)
+        self.ops = []
+        self.started = time.perf_counter()
+        self.captured = 0
+        self.written = 0
+        self.screen = None
+        self.previous = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._writer, name="asciicast-writer", daemon=True)
+        self._thread.start()
+    
+    def draw(self, y, x, text, color):
+        self.ops.append((y, x, text, color))
+    
+    def frame(self, rows, cols):
+        self.frames.append((time.perf_counter() - self.started, rows, cols, self.ops))
+        self.ops = []
+        self.captured += 1
+    
+    def _writer(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            while not self._stop.wait(self.flush_interval):
+                self._flush(f)
+            self._flush(f)
+    
+    def _flush(self, f):
+        lines = []
+        while self.frames:
+            try:
+                t, rows, cols, ops = self.frames.popleft()
+            except IndexError:
+                break
+            if self.screen is None:
+                lines.append(json.dumps({
+                    "version": 2, "width": cols, "height": rows, "timestamp": int(time.time()),
+                    "title": "Snake Game", "env": {"TERM": os.environ.get("TERM", "xterm-256color")},
+                }))
+            elif (rows, cols) != self.screen.getmaxyx():
+                lines.append(json.dumps([round(t, 6), "r", f"{cols}x{rows}"]))
+            if self.screen is None or (rows, cols) != self.screen.getmaxyx():
+                self.screen = VirtualScreen(rows, cols)
+                self.previous = None
+            
+            self.screen.clear()
+            for y, x, text, color in ops:
+                self.screen.addstr(y, x, text, color)
+            data = self.diff()
+            if data:
+                lines.append(json.dumps([round(t, 6), "o", data], ensure_ascii=False))
+            self.written += 1
+        if lines:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+    
+    def diff(self):
+        """Output ANSI yang mengubah frame sebelumnya menjadi frame saat ini"""
+        data = self.screen.diff(self.previous)
+        self.previous = self.screen.snapshot()
+        return data
+    
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        dropped = self.captured - self.written
+        if dropped > 0:
+            print(f"Asciicast: {dropped} frame dibuang karena buffer penuh")
+
+class SharedFrameBuffer:
+    """Double buffer frame di shared memory dengan penghitung sekuens.
+
+    Header menyimpan nomor frame lengkap terakhir. Frame N ditulis ke slot
+    N % 2; setiap slot punya sekuens sendiri yang ganjil selama ditulis
+    (seqlock), sehingga pembaca bisa mendeteksi dan mengulang pembacaan sobek.
+    """
+    
+    HEADER = struct.Struct("QII")   # frame terakhir, rows, cols
+    SLOT_HEADER = struct.Struct("Q")
+    
+    def __init__(self, rows, cols):
+        self.rows, self.cols = rows, cols
+        self.cells = rows * cols
+        self.slot_size = self.SLOT_HEADER.size + self.cells * 5
+        size = self.HEADER.size + 2 * self.slot_size
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.buf = self.shm.buf
+        self.HEADER.pack_into(self.buf, 0, 0, rows, cols)
+        self.frame = 0
+    
+    def _slot(self, frame):
+        return self.HEADER.size + (frame % 2) * self.slot_size
+    
+    def write(self, chars, colors):
+        """Terbitkan frame baru (dipanggil proses simulasi)"""
+        frame = self.frame + 1
+        offset = self._slot(frame)
+        seq = self.SLOT_HEADER.unpack_from(self.buf, offset)[0]
+        self.SLOT_HEADER.pack_into(self.buf, offset, seq + 1)
+        data = offset + self.SLOT_HEADER.size
+        self.buf[data:data + self.cells * 4] = chars.tobytes()
+        self.buf[data + self.cells * 4:data + self.cells * 5] = colors
+        self.SLOT_HEADER.pack_into(self.buf, offset, seq + 2)
+        self.HEADER.pack_into(self.buf, 0, frame, self.rows, self.cols)
+        self.frame = frame
+    
+    def read(self, last_frame):
+        """Frame lengkap terbaru setelah last_frame, atau None jika belum ada"""
+        while True:
+            frame = self.HEADER.unpack_from(self.buf, 0)[0]
+            if frame == last_frame:
+                return None
+            offset = self._slot(frame)
+            before = self.SLOT_HEADER.unpack_from(self.buf, offset)[0]
+            if before % 2:
+                continue
+            data = offset + self.SLOT_HEADER.size
+            chars = array("I")
+            chars.frombytes(self.buf[data:data + self.cells * 4])
+            colors = bytes(self.buf[data + self.cells * 4:data + self.cells * 5])
+            if self.SLOT_HEADER.unpack_from(self.buf, offset)[0] == before:
+                return frame, chars, colors
+    
+    def close(self):
+        self.buf = None
+        self.shm.close()
+    
+    def unlink(self):
+        self.shm.unlink()
+
+class SessionClosed(BaseException):
+    """Dilempar di thread sesi saat koneksinya ditutup, agar run() berhenti"""
+
+class HostedGame(HeadlessGame):
+    """SnakeGame satu koneksi GameHost: tunggu input dan tidur lewat penjadwal host"""
+    
+    def __init__(self, session, rows, cols):
+        super().__init__(VirtualScreen(rows, cols, on_refresh=session.render))
+        self.session = session
+    
+    def get_input(self, timeout=-1):
+        return self.session.wait_key(timeout)
+    
+    def sleep(self, seconds):
+        self.session.wait(seconds)
+
+class HostSession:
+    """Satu koneksi: game di thread sendiri yang hanya berjalan saat diberi giliran.
+    
+    Thread sesi dan thread event loop bergantian lewat dua semaphore, jadi
+    pada satu waktu hanya satu dari keduanya yang berjalan dan state host
+    boleh disentuh tanpa lock. Setiap kali game menunggu input atau tidur,
+    sesi memarkir dirinya (park) dengan deadline di penjadwal host.
+    """
+    
+    TELNET_SETUP = bytes([255, 251, 1, 255, 251, 3])  # IAC WILL ECHO, IAC WILL SUPPRESS-GO-AHEAD
+    # Panah ESC [ A-D -> (nama konstanta curses, kode fallback)
+    ARROWS = {ord("A"): ("KEY_UP", 72), ord("B"): ("KEY_DOWN", 80),
+              ord("C"): ("KEY_RIGHT", 77), ord("D"): ("KEY_LEFT", 75)}
+    
+    def __init__(self, host, writer, rows, cols):
+        self.host = host
+        self.writer = writer
+        self.keys = deque()
+        self.pending = b""
+        self.output = []
+        self.previous = None
+        self.want_key = False
+        self.wake_key = -1
+        self.version = 0
+        self.closed = False
+        self.finished = False
+        self.resumed = threading.Semaphore(0)
+        self.parked = threading.Semaphore(0)
+        self.game = HostedGame(self, rows, cols)
+        self.thread = threading.Thread(target=self.main, name="snake-session", daemon=True)
+    
+    def main(self):
+        self.resumed.acquire()
+        try:
+            if not self.closed:
+                self.game.run()
+        except (SessionClosed, SystemExit):
+            pass
+        finally:
+            self.finished = True
+            self.parked.release()
+    
+    def park(self, deadline, want_key):
+        """Serahkan giliran ke event loop sampai dibangunkan tombol atau deadline"""
+        self.want_key = want_key
+        self.wake_key = -1
+        self.host.schedule(self, deadline)
+        self.parked.release()
+        self.resumed.acquire()
+        self.want_key = False
+        if self.closed:
+            raise SessionClosed()
+        return self.wake_key
+    
+    def wait_key(self, timeout):
+        if self.keys:
+            return self.keys.popleft()
+        if timeout == 0:
+            return -1
+        return self.park(None if timeout < 0 else time.perf_counter() + timeout / 1000, True)
+    
+    def wait(self, seconds):
+        # Tombol yang datang selama tidur disimpan untuk get_input berikutnya
+        self.park(time.perf_counter() + seconds, False)
+    
+    def render(self, chars, colors):
+        # Klien lambat: frame dilewati, diff berikutnya tetap dari frame terakhir yang terkirim
+        if self.writer.transport.get_write_buffer_size() > self.host.max_backlog:
+            return
+        screen = self.game.screen
+        data = screen.diff(self.previous)
+        self.previous = screen.snapshot()
+        if data:
+            self.output.append(data)
+    
+    def feed(self, data):
+        """Terjemahkan byte dari klien (telnet/raw) menjadi kode tombol"""
+        data = self.pending + data
+        self.pending = b""
+        i = 0
+        while i < len(data):
+            byte = data[i]
+            if byte == 255:
+                # Negosiasi telnet: IAC cmd [opsi] atau IAC SB ... IAC SE
+                if i + 1 >= len(data):
+                    self.pending = data[i:]
+                    break
+                command = data[i + 1]
+                if command == 255:
+                    self.keys.append(255)
+                    i += 2
+                elif command == 250:
+                    end = data.find(bytes([255, 240]), i + 2)
+                    if end < 0:
+                        self.pending = data[i:]
+                        break
+                    i = end + 2
+                elif 251 <= command <= 254:
+                    if i + 2 >= len(data):
+                        self.pending = data[i:]
+                        break
+                    i += 3
+                else:
+                    i += 2
+            elif byte == 27 and data[i + 1:i + 2] in (b"[", b"O") and i + 2 < len(data) and data[i + 2] in self.ARROWS:
+                name, code = self.ARROWS[data[i + 2]]
+                self.keys.append(getattr(curses, name) if HAS_CURSES else code)
+                i += 3
+            elif byte == 13:
+                # Enter dikirim sebagai CR LF atau CR NUL
+                self.keys.append(13)
+                i += 2 if data[i + 1:i + 2] in (b"\n", b"\0") else 1
+            elif byte:
+                self.keys.append(byte)
+                i += 1
+            else:
+                i += 1
+
+class GameHost:
+    """Banyak sesi SnakeGame independen dalam satu proses dan satu event loop asyncio.
+    
+    Setiap koneksi TCP/telnet mendapat HostedGame sendiri (menu, pengaturan,
+    level dan skor terpisah) yang menggambar ke VirtualScreen; setiap refresh
+    hanya mengirim diff ANSI ke koneksinya. Semua timer sesi (tick game,
+    timeout input) ada di satu heap; satu alarm event loop membangunkan sesi
+    yang jatuh tempo. Sesi yang menunggu tombol di menu tidak punya timer
+    sama sekali, jadi sesi diam tidak memakai CPU.
+    """
+    
+    def __init__(self, args, rows=24, cols=80, max_sessions=500, max_backlog=65536):
+        self.args = args
+        self.rows, self.cols = rows, cols
+        self.max_sessions = max_sessions
+        self.max_backlog = max_backlog
+        self.sessions = set()
+        self.timers = []
+        self.sequence = 0
+        self.alarm = None
+        self.alarm_at = None
+        self.loop = None
+    
+    async def serve(self, address, port):
+        self.loop = asyncio.get_running_loop()
+        server = await asyncio.start_server(self.handle, address, port)
+        async with server:
+            await server.serve_forever()
+    
+    async def handle(self, reader, writer):
+        if len(self.sessions) >= self.max_sessions:
+            writer.write(b"Server full, try again later\r\n")
+            writer.close()
+            return
+        session = HostSession(self, writer, self.rows, self.cols)
+        configure_session(session.game, self.args)
+        self.sessions.add(session)
+        writer.write(HostSession.TELNET_SETUP)
+        session.thread.start()
+        # Jalankan sampai game menunggu input pertama (menu utama)
+        self.resume(session)
+        self.arm()
+        try:
+            while not session.finished:
+                data = await reader.read(1024)
+                if not data:
+                    break
+                session.feed(data)
+                if session.want_key and session.keys:
+                    self.resume(session, session.keys.popleft())
+                    self.arm()
+        except ConnectionError:
+            pass
+        finally:
+            self.close(session)
+    
+    def schedule(self, session, deadline):
+        # Versi baru membuat timer lama sesi ini usang (dibuang saat keluar heap)
+        session.version += 1
+        if deadline is not None:
+            self.sequence += 1
+            heapq.heappush(self.timers, (deadline, self.sequence, session, session.version))
+    
+    def resume(self, session, key=-1):
+        """Beri giliran ke sesi sampai ia parkir lagi, lalu kirim output-nya"""
+        session.wake_key = key
+        session.resumed.release()
+        session.parked.acquire()
+        if session.output:
+            session.writer.write("".join(session.output).encode())
+            session.output.clear()
+        if session.finished:
+            # Game keluar sendiri (menu Exit): kembalikan kursor lalu putuskan koneksi
+            session.writer.write(b"\033[0m\033[2J\033[H\033[?25h")
+            session.writer.close()
+    
+    def arm(self):
+        """Pasang satu alarm event loop untuk timer paling awal"""
+        while self.timers and (self.timers[0][3] != self.timers[0][2].version or self.timers[0][2].finished):
+            heapq.heappop(self.timers)
+        if not self.timers:
+            return
+        deadline = self.timers[0][0]
+        if self.alarm and self.alarm_at <= deadline:
+            return
+        if self.alarm:
+            self.alarm.cancel()
+        self.alarm_at = deadline
+        self.alarm = self.loop.call_later(max(0, deadline - time.perf_counter()), self.fire)
+    
+    def fire(self):
+        self.alarm = None
+        now = time.perf_counter()
+        while self.timers and self.timers[0][0] <= now:
+            _, _, session, version = heapq.heappop(self.timers)
+            if version == session.version and not session.finished:
+                self.resume(session)
+        self.arm()
+    
+    def close(self, session):
+        if not session.finished:
+            # Bangunkan sesi dengan SessionClosed agar thread-nya selesai
+            session.closed = True
+            session.version += 1
+            session.resumed.release()
+            session.parked.acquire()
+        session.thread.join()
+        self.sessions.discard(session)
+        session.writer.close()
+
+def run_simulation(args, frames, keys):
+    # Proses simulasi: Ctrl+C ditangani oleh proses renderer
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    screen = VirtualScreen(frames.rows, frames.cols, keys, frames.write)
+    game = configure_game(HeadlessGame(screen), args)
+    game.run()
+
+def render_frames(renderer, frames, keys, simulation):
+    """Gambar frame terbaru dari shared memory dan teruskan tombol ke simulasi.
+
+    Frame yang terlewat selama terminal lambat langsung dibuang; hanya baris
+    yang berubah sejak frame terakhir yang digambar ulang.
+    """
+    rows, cols = frames.rows, frames.cols
+    drawn = [None] * rows
+    last_frame = 0
+    renderer.screen.timeout(10)
+    while simulation.is_alive():
+        key = renderer.screen.getch()
+        if key != -1:
+            keys.put(key)
+        
+        latest = frames.read(last_frame)
+        if latest is None:
+            continue
+        last_frame, chars, colors = latest
+        for y in range(rows):
+            start = y * cols
+            row = (chars[start:start + cols], colors[start:start + cols])
+            if row == drawn[y]:
+                continue
+            drawn[y] = row
+            row_chars, row_colors = row
+            x = 0
+            while x < cols:
+                color = row_colors[x]
+                end = x + 1
+                while end < cols and row_colors[end] == color:
+                    end += 1
+                text = "".join(chr(code) for code in row_chars[x:end] if code)
+                renderer.draw_text(y, x, text, color)
+                x = end
+        renderer.refresh_screen()
+
+def run_split(args):
+    """Simulasi dan rendering di proses terpisah yang berbagi frame via shared memory"""
+    if shared_memory is None:
+        sys.exit("--split-render needs multiprocessing.shared_memory, which this Python build lacks")
+    context = multiprocessing.get_context("fork")
+    renderer = SnakeGame()
+    renderer.init_screen()
+    frames = SharedFrameBuffer(renderer.max_y, renderer.max_x)
+    keys = context.Queue()
+    simulation = context.Process(target=run_simulation, args=(args, frames, keys), daemon=True)
+    try:
+        simulation.start()
+        render_frames(renderer, frames, keys, simulation)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if simulation.is_alive():
+            simulation.terminate()
+        simulation.join()
+        renderer.cleanup_screen()
+        frames.close()
+        frames.unlink()
+
+def run_host(args):
+    address, _, port = args.host.rpartition(":")
+    cols, _, rows = args.session_size.partition("x")
+    host = GameHost(args, max(20, int(rows)), max(40, int(cols)), max_sessions=args.max_sessions)
+    print(f"Snake host listening on {address or '0.0.0.0'}:{port} (telnet/nc)")
+    try:
+        asyncio.run(host.serve(address or None, int(port)))
+    except KeyboardInterrupt:
+        pass
+
+def configure_session(game, args):
+    # Opsi gameplay saja; file output (telemetry, rekaman, bot) tidak dibuat per sesi host
+    game.autopilot = args.autopilot
+    game.food_items = max(1, args.food)
+    game.ai_player2 = args.ai
+    game.snake_speeds = [max(0.1, args.speed1), max(0.1, args.speed2)]
+    return game
+
+def configure_game(game, args):
+    configure_session(game, args)
+    if args.telemetry:
+        game.telemetry = Telemetry(args.telemetry)
+    if args.asciicast:
+        game.asciicast = Asciicast(args.asciicast)
+    game.record_dir = args.record
+    bots = {player: command for player, command in ((1, args.bot1), (2, args.bot2)) if command}
+    if bots:
+        game.bots = BotPool(bots, max(1, args.bot_timeout) / 1000)
+    if args.replay:
+        game.replay_path = args.replay
+        game.game_state = GameState.REPLAY
+    return game
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Snake Game - Python Edition")
+    parser.add_argument("--telemetry", metavar="PATH",
+                        help="tulis event gameplay sebagai JSON lines ke PATH")
+    parser.add_argument("--food", type=int, default=1, metavar="N",
+                        help="jumlah makanan di area bermain sekaligus")
+    parser.add_argument("--autopilot", action="store_true",
+                        help="pemain 1 dikendalikan siklus Hamilton sampai siklusnya penuh")
+    parser.add_argument("--ai", action="store_true",
+                        help="pemain 2 di mode multiplayer dikendalikan komputer")
+    parser.add_argument("--speed1", type=float, default=1.0, metavar="X",
+                        help="kecepatan relatif ular 1 (misalnya 0.8 sebagai handicap)")
+    parser.add_argument("--speed2", type=float, default=1.0, metavar="X",
+                        help="kecepatan relatif ular 2 / lawan komputer")
+    parser.add_argument("--split-render", action="store_true",
+                        help="jalankan simulasi dan rendering di proses terpisah")
+    parser.add_argument("--record", metavar="DIR",
+                        help="rekam setiap level yang dimainkan ke DIR (*.snkrec)")
+    parser.add_argument("--replay", metavar="FILE",
+                        help="putar file rekaman di viewer replay")
+    parser.add_argument("--asciicast", metavar="PATH",
+                        help="rekam output terminal sebagai asciicast v2 ke PATH")
+    parser.add_argument("--bot1", metavar="CMD",
+                        help="pemain 1 dikendalikan program eksternal (JSON lines lewat stdin/stdout)")
+    parser.add_argument("--bot2", metavar="CMD",
+                        help="pemain 2 di mode multiplayer dikendalikan program eksternal")
+    parser.add_argument("--bot-timeout", type=float, default=100, metavar="MS",
+                        help="deadline jawaban bot per tick; terlambat berarti jalan lurus")
+    parser.add_argument("--host", metavar="[ADDR:]PORT",
+                        help="layani banyak sesi game lewat TCP/telnet dari satu proses")
+    parser.add_argument("--max-sessions", type=int, default=500, metavar="N",
+                        help="jumlah maksimum sesi bersamaan di mode --host")
+    parser.add_argument("--session-size", default="80x24", metavar="COLSxROWS",
+                        help="ukuran layar setiap sesi di mode --host")
+    parser.add_argument("--no-curses", action="store_true",
+                        help="paksa mode fallback (ANSI) walaupun curses tersedia")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
+    args = parse_args()
+    if args.no_curses:
+        HAS_CURSES = False
     print("Starting Snake Game...")
     if not HAS_CURSES:
         print("Note: Running in fallback mode (curses not available)")
         print("For multiplayer, use IJKL for Player 2")
     
-    game = SnakeGame()
-    game.run()
\ No newline at end of file
+    if args.host:
+        run_host(args)
+    elif args.split_render and HAS_CURSES:
+        run_split(args)
+    else:
+        configure_game(SnakeGame(), args).run()
\ No newline at end of file
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""Soak test jangka panjang untuk SnakeGame.
+
+Game dijalankan terus-menerus melalui siklus menu -> main -> game over /
+level complete dengan pemain bot yang membaca frame dari draw_cells dan
+menekan tombol WASD seperti pemain sungguhan. Setiap interval, tracemalloc,
+RSS dan latensi tick dicatat; soak gagal jika memori atau latensi p99
+bertambah melewati ambang batas.
+
+Backend curses dan fallback masing-masing dijalankan di proses anak pada
+pseudo-terminal sehingga jalur gambar yang sebenarnya ikut diuji.
+
+    python soak.py --ticks 1000000 --backend both
+"""
+import argparse
+import fcntl
+import json
+import os
+import pty
+import random
+import select
+import struct
+import sys
+import tempfile
+import termios
+import time
+import traceback
+import tracemalloc
+
+import main
+from main import Colors, GameState
+
+
+class SoakComplete(BaseException):
+    """Dilempar untuk menghentikan run() setelah jumlah tick tercapai"""
+
+
+class SoakGame(main.SnakeGame):
+    # Tombol yang ditekan di setiap layar selain permainan, bergiliran
+    MENU_KEYS = {
+        GameState.MENU: "11342",
+        GameState.SETTINGS: "45",
+        GameState.HIGH_SCORES: " ",
+        GameState.GAME_OVER: "rrm",
+        GameState.PLAYING: "nnnm",  # layar level complete / board full
+    }
+    MOVES = (("w", -1, 0), ("s", 1, 0), ("a", 0, -1), ("d", 0, 1))
+    OPPOSITE = {"w": "s", "s": "w", "a": "d", "d": "a"}
+
+    def __init__(self, ticks, sample_every, seed=0):
+        super().__init__()
+        self.game_speed = 0
+        self.target_ticks = ticks
+        self.sample_every = sample_every
+        self.rng = random.Random(seed)
+        self.ticks = 0
+        self.in_game = False
+        self.frame = {}
+        self.last_key = "d"
+        self.menu_presses = {state: 0 for state in self.MENU_KEYS}
+        self.latencies = []
+        self.last_tick_time = None
+        self.samples = []
+        self.games = 0
+        self.crash = None
+
+    def handle_error(self, error):
+        # run() menelan exception; simpan traceback agar soak gagal karenanya
+        self.crash = traceback.format_exc()
+        super().handle_error(error)
+
+    def clear_screen(self):
+        # Hindari os.system('clear') per frame: satu proses per tick akan
+        # mendominasi pengukuran pada jalur fallback
+        sys.stdout.write("\033[2J\033[H")
+
+    def draw_cells(self, cells):
+        self.frame = cells
+        super().draw_cells(cells)
+
+    def game_loop(self):
+        self.in_game = True
+        self.games += 1
+        self.last_key = "d"
+        self.last_tick_time = None
+        try:
+            return super().game_loop()
+        finally:
+            self.in_game = False
+
+    def get_input(self, timeout=100):
+        if not self.in_game:
+            keys = self.MENU_KEYS[self.game_state]
+            index = self.menu_presses[self.game_state]
+            self.menu_presses[self.game_state] = index + 1
+            return ord(keys[index % len(keys)])
+
+        now = time.perf_counter()
+        if self.last_tick_time is not None:
+            self.latencies.append(now - self.last_tick_time)
+        self.last_tick_time = now
+
+        self.ticks += 1
+        if self.ticks % self.sample_every == 0:
+            self.sample()
+        if self.ticks >= self.target_ticks:
+            raise SoakComplete()
+        return ord(self.bot_key())
+
+    def bot_key(self):
+        # Kepala dari frame terakhir, makanan terdekat dari indeks makanan game
+        head = next((cell for cell, (char, color) in self.frame.items()
+                     if char == self.snake_char and color == Colors.GREEN), None)
+        if head is None:
+            return self.last_key
+        food = self.foods.nearest(*head)
+
+        options = []
+        for key, dy, dx in self.MOVES:
+            if key == self.OPPOSITE[self.last_key]:
+                continue
+            cell = (head[0] + dy, head[1] + dx)
+            if cell in self.frame and cell not in self.foods:
+                continue
+            distance = abs(cell[0] - food[0]) + abs(cell[1] - food[1]) if food else 0
+            options.append((distance, key))
+        if not options:
+            return self.last_key
+
+        # Sesekali bergerak acak agar bot juga mati dan siklus game over teruji
+        if self.rng.random() < 0.02:
+            self.last_key = self.rng.choice(options)[1]
+        else:
+            self.last_key = min(options)[1]
+        return self.last_key
+
+    def sample(self):
+        latencies = sorted(self.latencies)
+        self.latencies = []
+        traced, _ = tracemalloc.get_traced_memory()
+        self.samples.append({
+            "ticks": self.ticks,
+            "games": self.games,
+            "traced": traced,
+            "rss": rss_bytes(),
+            "p50": latencies[len(latencies) // 2] if latencies else 0.0,
+            "p99": latencies[int(len(latencies) * 0.99)] if latencies else 0.0,
+        })
+
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def run_child(args):
+    if args.child == "fallback":
+        main.HAS_CURSES = False
+    tracemalloc.start()
+    game = SoakGame(args.ticks, args.sample_every, args.seed)
+    started = time.perf_counter()
+    try:
+        game.run()
+    except SoakComplete:
+        pass
+    result = {
+        "backend": args.child,
+        "ticks": game.ticks,
+        "games": game.games,
+        "seconds": time.perf_counter() - started,
+        "samples": game.samples,
+        "crash": game.crash,
+    }
+    with open(args.result, "w") as f:
+        json.dump(result, f)
+
+
+def run_backend(backend, args):
+    """Jalankan satu backend di proses anak pada pseudo-terminal"""
+    fd, result_path = tempfile.mkstemp(prefix=f"soak-{backend}-", suffix=".json")
+    os.close(fd)
+    command = [sys.executable, os.path.abspath(__file__), "--child", backend,
+               "--ticks", str(args.ticks), "--sample-every", str(args.sample_every),
+               "--seed", str(args.seed), "--result", result_path]
+
+    pid, master = pty.fork()
+    if pid == 0:
+        fcntl.ioctl(0, termios.TIOCSWINSZ, struct.pack("HHHH", args.rows, args.cols, 0, 0))
+        os.environ.setdefault("TERM", "xterm-256color")
+        os.execv(sys.executable, command)
+
+    # Output terminal dibuang, tetapi harus terus dibaca agar anak tidak terblokir
+    while True:
+        ready, _, _ = select.select([master], [], [], 1.0)
+        if ready:
+            try:
+                if not os.read(master, 65536):
+                    break
+            except OSError:
+                break
+    _, status = os.waitpid(pid, 0)
+    os.close(master)
+
+    try:
+        with open(result_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"backend": backend, "error": f"child exited with status {status}", "samples": []}
+    finally:
+        os.unlink(result_path)
+
+
+def check_drift(result, args):
+    """Bandingkan sampel awal (setelah warmup) dengan sampel terakhir"""
+    failures = []
+    if result.get("crash"):
+        failures.append("game crashed: " + result["crash"].strip().splitlines()[-1])
+    if result["ticks"] < args.ticks:
+        failures.append(f"stopped after {result['ticks']} of {args.ticks} ticks")
+    samples = result["samples"][args.warmup:]
+    if len(samples) < 2:
+        return failures + ["not enough samples (increase --ticks or lower --sample-every)"]
+    first, last = samples[0], samples[-1]
+    traced_growth = (last["traced"] - first["traced"]) / 1024 / 1024
+    rss_growth = (last["rss"] - first["rss"]) / 1024 / 1024
+    if traced_growth > args.max_mem_growth:
+        failures.append(f"traced memory grew {traced_growth:.2f} MB")
+    if rss_growth > args.max_rss_growth:
+        failures.append(f"RSS grew {rss_growth:.2f} MB")
+    # p99 dibandingkan dengan median beberapa sampel awal agar tidak sensitif noise
+    baseline = sorted(s["p99"] for s in samples[:3])[len(samples[:3]) // 2]
+    tail = sorted(s["p99"] for s in samples[-3:])[len(samples[-3:]) // 2]
+    if baseline and tail > baseline * args.max_latency_growth:
+        failures.append(f"p99 tick latency grew {baseline * 1000:.3f} -> {tail * 1000:.3f} ms")
+    return failures
+
+
+def report(result, failures):
+    print(f"\n== {result['backend']} ==")
+    if "error" in result:
+        print(f"  {result['error']}")
+        return
+    print(f"  ticks={result['ticks']} games={result['games']} time={result['seconds']:.1f}s")
+    print(f"  {'ticks':>10} {'games':>7} {'traced KB':>10} {'rss KB':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for s in result["samples"]:
+        print(f"  {s['ticks']:>10} {s['games']:>7} {s['traced'] // 1024:>10} {s['rss'] // 1024:>9} "
+              f"{s['p50'] * 1000:>8.3f} {s['p99'] * 1000:>8.3f}")
+    if result.get("crash"):
+        print("  " + result["crash"].rstrip().replace("\n", "\n  "))
+    print("  FAIL: " + "; ".join(failures) if failures else "  OK")
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Soak test SnakeGame")
+    parser.add_argument("--ticks", type=int, default=1_000_000, help="jumlah tick per backend")
+    parser.add_argument("--sample-every", type=int, default=10_000, help="interval sampel dalam tick")
+    parser.add_argument("--backend", choices=("curses", "fallback", "both"), default="both")
+    parser.add_argument("--rows", type=int, default=24)
+    parser.add_argument("--cols", type=int, default=80)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warmup", type=int, default=1, help="sampel awal yang diabaikan")
+    parser.add_argument("--max-mem-growth", type=float, default=4.0, help="MB tracemalloc")
+    parser.add_argument("--max-rss-growth", type=float, default=32.0, help="MB RSS")
+    parser.add_argument("--max-latency-growth", type=float, default=1.5, help="rasio p99 akhir/awal")
+    parser.add_argument("--child", choices=("curses", "fallback"), help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(args)
+        return 0
+
+    backends = ("curses", "fallback") if args.backend == "both" else (args.backend,)
+    failed = False
+    for backend in backends:
+        result = run_backend(backend, args)
+        failures = ["child did not finish"] if "error" in result else check_drift(result, args)
+        report(result, failures)
+        failed = failed or bool(failures)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())